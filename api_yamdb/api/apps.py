@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from . import cache, conditional
+
+        cache.connect_signals()
+        conditional.connect_signals()
@@ -0,0 +1,151 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from rest_framework import status
+from rest_framework.response import Response
+
+from reviews.models import Categories, Genre, Title, TitlesGenres
+from reviews.signals import title_rating_changed
+
+VERSION_KEY = 'catalog:version:{resource}'
+MODIFIED_KEY = 'catalog:modified:{resource}'
+RESPONSE_KEY = 'catalog:response:{resource}:{version}:{digest}'
+
+# Cached resources and the models whose writes change their responses.
+RESOURCE_MODELS = {
+    'titles': (Title, TitlesGenres, Genre, Categories),
+    'categories': (Categories,),
+    'genres': (Genre,),
+}
+
+
+def get_version(resource):
+    """
+    Returns the current version of a resource. A missing counter starts
+    from the current time, so a counter evicted from the cache never
+    repeats a version that cached responses may still be stored under.
+    Counters live CACHE_VERSION_TIMEOUT seconds from their start, which
+    bounds how long a process misses the writes of other processes when
+    the cache isn't shared. A new counter counts as a write, since such
+    writes may have happened.
+    """
+    key = VERSION_KEY.format(resource=resource)
+    version = cache.get(key)
+    if version is None:
+        now = time.time()
+        if cache.add(key, int(now * 1000),
+                     timeout=settings.CACHE_VERSION_TIMEOUT):
+            cache.set(MODIFIED_KEY.format(resource=resource), int(now),
+                      timeout=settings.CACHE_VERSION_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(resource):
+    """Makes every cached response of the resource unreachable."""
+    key = VERSION_KEY.format(resource=resource)
+    try:
+        # The counter keeps the expiry it started with.
+        cache.incr(key)
+    except ValueError:
+        get_version(resource)
+    cache.set(
+        MODIFIED_KEY.format(resource=resource), int(time.time()),
+        timeout=settings.CACHE_VERSION_TIMEOUT
+    )
+
+
+def get_modified(resource):
+    """Time of the last recorded write to the resource, if known."""
+    return cache.get(MODIFIED_KEY.format(resource=resource))
+
+
+def bump_after_commit(*resources):
+    """
+    Bumps the versions once the write is committed, so a concurrent reader
+    can't cache the old rows under the new version.
+    """
+    def bump():
+        for resource in resources:
+            bump_version(resource)
+    transaction.on_commit(bump)
+
+
+def _resources_of(model):
+    return tuple(
+        resource for resource, models in RESOURCE_MODELS.items()
+        if model in models
+    )
+
+
+def _model_changed(sender, **kwargs):
+    bump_after_commit(*_resources_of(sender))
+
+
+def _genres_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_after_commit(*_resources_of(TitlesGenres))
+
+
+def _rating_changed(sender, **kwargs):
+    bump_after_commit('titles')
+
+
+def connect_signals():
+    """Subscribes the cache to the writes of the catalog models."""
+    models = {model for group in RESOURCE_MODELS.values() for model in group}
+    for model in models:
+        uid = f'catalog_cache_{model._meta.label_lower}'
+        post_save.connect(_model_changed, sender=model, dispatch_uid=uid)
+        post_delete.connect(_model_changed, sender=model, dispatch_uid=uid)
+    m2m_changed.connect(
+        _genres_changed, sender=Title.genre.through,
+        dispatch_uid='catalog_cache_title_genre'
+    )
+    title_rating_changed.connect(
+        _rating_changed, dispatch_uid='catalog_cache_title_rating'
+    )
+
+
+def make_response_key(resource, request, view):
+    """
+    Builds the cache key from the route and normalized query params. The
+    host is a part of the key since pagination links are absolute.
+    """
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    route = sorted(view.kwargs.items())
+    raw = repr((request.get_host(), view.action, route, params)).encode()
+    return RESPONSE_KEY.format(
+        resource=resource,
+        version=get_version(resource),
+        digest=hashlib.md5(raw).hexdigest(),
+    )
+
+
+class CatalogCacheMixin:
+    """
+    Caches serialized list responses under the version of `cache_resource`.
+    Any write to a model the resource depends on bumps the version.
+    """
+    cache_resource = None
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = make_response_key(self.cache_resource, request, self)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
@@ -0,0 +1,110 @@
+import hashlib
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+from .cache import bump_after_commit, get_modified, make_response_key
+
+REVIEWS_RESOURCE = 'reviews:{title_id}'
+COMMENTS_RESOURCE = 'comments:{review_id}'
+
+
+def _title_changed(sender, instance, **kwargs):
+    # Reviews show the name of their title.
+    bump_after_commit(REVIEWS_RESOURCE.format(title_id=instance.pk))
+
+
+def _review_changed(sender, instance, **kwargs):
+    # Comments show the text of their review.
+    bump_after_commit(
+        REVIEWS_RESOURCE.format(title_id=instance.title_id),
+        COMMENTS_RESOURCE.format(review_id=instance.pk),
+    )
+
+
+def _comment_changed(sender, instance, **kwargs):
+    bump_after_commit(COMMENTS_RESOURCE.format(review_id=instance.review_id))
+
+
+def _user_saving(sender, instance, raw=False, update_fields=None,
+                 **kwargs):
+    instance._stored_username = None
+    if raw or instance.pk is None or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    instance._stored_username = User.objects.filter(
+        pk=instance.pk
+    ).values_list('username', flat=True).first()
+
+
+def _user_saved(sender, instance, raw=False, **kwargs):
+    # Reviews and comments show the username of their author.
+    stored = getattr(instance, '_stored_username', None)
+    if raw or stored is None or stored == instance.username:
+        return
+    titles = Review.objects.filter(author=instance).values_list(
+        'title_id', flat=True
+    ).distinct()
+    reviews = Comment.objects.filter(author=instance).values_list(
+        'review_id', flat=True
+    ).distinct()
+    bump_after_commit(
+        *(REVIEWS_RESOURCE.format(title_id=pk) for pk in titles),
+        *(COMMENTS_RESOURCE.format(review_id=pk) for pk in reviews),
+    )
+
+
+def connect_signals():
+    """Subscribes the per-title and per-review markers to writes."""
+    for model, receiver in (
+        (Title, _title_changed),
+        (Review, _review_changed),
+        (Comment, _comment_changed),
+    ):
+        uid = f'conditional_{model._meta.label_lower}'
+        post_save.connect(receiver, sender=model, dispatch_uid=uid)
+        post_delete.connect(receiver, sender=model, dispatch_uid=uid)
+    pre_save.connect(_user_saving, sender=User,
+                     dispatch_uid='conditional_users.user')
+    post_save.connect(_user_saved, sender=User,
+                      dispatch_uid='conditional_users.user')
+
+
+class ConditionalGetMixin:
+    """
+    Emits ETag and Last-Modified for list responses and answers
+    If-None-Match / If-Modified-Since with 304 before the queryset and the
+    serializer run. Both are derived from the version counter named by
+    `get_version_resource`, which is bumped by every write to the data the
+    response is built from. Writes of other processes are seen once the
+    counter expires, see CACHE_VERSION_TIMEOUT.
+    """
+
+    def get_version_resource(self):
+        return self.cache_resource
+
+    def conditional_response(self, handler, *args, **kwargs):
+        resource = self.get_version_resource()
+        key = make_response_key(resource, self.request, self)
+        etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+        last_modified = get_modified(resource)
+        response = get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(*args, **kwargs)
+            if not 200 <= response.status_code < 300:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request,
+                                         *args, **kwargs)
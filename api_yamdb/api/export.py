@@ -0,0 +1,35 @@
+from itertools import islice
+
+from reviews.models import Title
+
+from .renderers import FastJSONRenderer
+from .serializers import TitleRowSerializer
+
+
+def iter_title_chunks(after_id=0, chunk_size=2000):
+    """Yields lists of title rows with id greater than `after_id`."""
+    rows = Title.objects.filter(id__gt=after_id).order_by('id').values(
+        *TitleRowSerializer.row_fields
+    ).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_titles_ndjson(after_id=0, chunk_size=2000):
+    """
+    Streams every title with its genres, category and rating as
+    newline-delimited JSON. Only one chunk of rows is held in memory, the
+    id of the last line received can be passed back as `after_id`.
+    """
+    renderer = FastJSONRenderer()
+    for chunk in iter_title_chunks(after_id, chunk_size):
+        genres = TitleRowSerializer.load_genres([row['id'] for row in chunk])
+        yield b''.join(
+            renderer.render(
+                TitleRowSerializer.represent(row, genres[row['id']])
+            ) + b'\n'
+            for row in chunk
+        )
@@ -1,6 +1,7 @@
 from django_filters import rest_framework as filters
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitlesFilter(filters.FilterSet):
@@ -18,6 +19,11 @@ class TitlesFilter(filters.FilterSet):
         field_name='genre__slug',
         lookup_expr='iexact'
     )
+    search = filters.CharFilter(method='filter_search')
+
+    def filter_search(self, queryset, name, value):
+        """Full-text search over name and description, ranked."""
+        return search_titles(queryset, value)
 
     class Meta:
         model = Title
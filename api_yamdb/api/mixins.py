@@ -1,4 +1,7 @@
-from rest_framework import mixins, viewsets
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import mixins, serializers, viewsets
 
 
 class CreateListDestroyViewSet(
@@ -9,3 +12,56 @@ class CreateListDestroyViewSet(
 ):
     """Ables to use create, list and destroy actions."""
     pass
+
+
+def _plan_serializer(serializer, model, prefix, many, select, prefetch):
+    """Walks readable fields of a serializer along the model relations."""
+    for field in getattr(serializer, 'fields', {}).values():
+        if field.write_only or not field.source_attrs:
+            continue
+        current, path, is_many = model, prefix, many
+        for attr in field.source_attrs:
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation:
+                break
+            path = f'{path}__{attr}' if path else attr
+            is_many = is_many or model_field.many_to_many
+            is_many = is_many or model_field.one_to_many
+            (prefetch if is_many else select).add(path)
+            current = model_field.related_model
+        else:
+            child = getattr(field, 'child', field)
+            if isinstance(child, serializers.BaseSerializer):
+                _plan_serializer(child, current, path, is_many,
+                                 select, prefetch)
+
+
+@lru_cache(maxsize=None)
+def plan_related(serializer_class, model):
+    """
+    Returns the `select_related` and `prefetch_related` lookups needed to
+    render `serializer_class` over `model` without per-object queries.
+    Forward single-valued relations are joined, everything reached through
+    a to-many relation is prefetched.
+    """
+    select, prefetch = set(), set()
+    _plan_serializer(serializer_class(), model, '', False, select, prefetch)
+    return tuple(sorted(select)), tuple(sorted(prefetch))
+
+
+class RelatedQuerysetMixin:
+    """Loads the relations read by the serializer together with the page."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        select, prefetch = plan_related(
+            self.get_serializer_class(), queryset.model
+        )
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
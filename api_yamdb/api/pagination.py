@@ -0,0 +1,165 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over the `keyset_ordering` of a view.
+    Pages are selected with `WHERE (a, b) > (x, y)` style conditions instead
+    of OFFSET, no total count is calculated and the cursors are opaque.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def __init__(self, page_size, ordering):
+        self.page_size = page_size
+        self.ordering = tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        position, self.reverse = self.decode_cursor(request, queryset)
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous = position is not None
+            self.has_next = has_more
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request, queryset):
+        """
+        Returns the position and the direction stored in the cursor, the
+        values converted to the types of the ordering fields.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            data = json.loads(base64.urlsafe_b64decode(encoded + padding))
+            position, reverse = data['p'], bool(data.get('r'))
+            if len(position) != len(self.ordering) or not all(
+                isinstance(value, (str, int, float)) for value in position
+            ):
+                raise ValueError
+            opts = queryset.model._meta
+            position = [
+                opts.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, item, reverse):
+        position = [self._value(item, field) for field in self.ordering]
+        data = {'p': position}
+        if reverse:
+            data['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(data, separators=(',', ':')).encode()
+        ).decode().rstrip('=')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _value(item, field):
+        name = field.lstrip('-')
+        value = item[name] if isinstance(item, dict) else getattr(item, name)
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    @staticmethod
+    def _after(ordering, position):
+        """Rows strictly after `position` in the given ordering."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+
+class OptionalKeysetPagination(PageNumberPagination):
+    """
+    Page number pagination by default. Views that declare `keyset_ordering`
+    switch to KeysetPagination when a request has `?pagination=cursor` or
+    carries a cursor, so existing clients keep receiving `count`.
+    """
+    mode_query_param = 'pagination'
+    keyset_mode = 'cursor'
+
+    def get_keyset_paginator(self, request, view):
+        ordering = getattr(view, 'keyset_ordering', None)
+        if ordering is None:
+            return None
+        params = request.query_params
+        if (
+            params.get(self.mode_query_param) != self.keyset_mode
+            and KeysetPagination.cursor_query_param not in params
+        ):
+            return None
+        return KeysetPagination(self.get_page_size(request), ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.get_keyset_paginator(request, view)
+        if self.keyset is not None:
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -27,7 +27,7 @@ class IsAdminModerAuthorOrReadOnly(permissions.BasePermission):
             request.method in permissions.SAFE_METHODS
             or request.user.role == User.ALLOWED_ROLES[0]
             or request.user.role == User.ALLOWED_ROLES[1]
-            or obj.author == request.user
+            or obj.author_id == request.user.id
         )
 
     def has_permission(self, request, view):
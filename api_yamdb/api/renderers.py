@@ -0,0 +1,46 @@
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson and orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer backed by orjson when it is installed. Values orjson can't
+    encode itself, as well as datetimes, are passed to DRF's JSONEncoder,
+    so the output matches the stdlib renderer. Pretty printed, ASCII-only
+    or non compact output falls back to the stdlib renderer.
+
+    One difference is kept for speed: orjson writes NaN and infinite
+    floats as `null`, where JSONRenderer with STRICT_JSON raises. The API
+    serializers produce no float fields, a view rendering computed floats
+    should use JSONRenderer.
+    """
+    _encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type,
+                               renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        ret = orjson.dumps(
+            data, default=self._encoder.default, option=ORJSON_OPTIONS
+        )
+        # Keep the output a strict javascript subset, like JSONRenderer.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028')
+            ret = ret.replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
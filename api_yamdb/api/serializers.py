@@ -1,5 +1,10 @@
+from collections import OrderedDict, defaultdict
+
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils.encoding import smart_str
 from rest_framework import serializers
-from reviews.models import Categories, Genre, Title
+from reviews.models import Categories, Genre, Title, TitlesGenres
 
 
 class CategoriesSerializer(serializers.ModelSerializer):
@@ -26,25 +31,109 @@ class GenresSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField that resolves slugs from objects preloaded by the
+    parent list serializer and queries the database only without them.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {})
+        model = self.get_queryset().model
+        if model not in preloaded:
+            return super().to_internal_value(data)
+        if not isinstance(data, (str, int)):
+            self.fail('invalid')
+        try:
+            return preloaded[model][str(data)]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+
+
+class TitlesBulkSerializer(serializers.ListSerializer):
+    """
+    Creates many titles at once: genre and category slugs of all items are
+    resolved with one query per table, titles and their genre links are
+    inserted with bulk_create in a single transaction.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.preload(data)
+        return super().to_internal_value(data)
+
+    def preload(self, data):
+        slugs = {'genre': set(), 'category': set()}
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            genres = item.get('genre')
+            if isinstance(genres, list):
+                slugs['genre'].update(
+                    str(slug) for slug in genres
+                    if isinstance(slug, (str, int))
+                )
+            if isinstance(item.get('category'), (str, int)):
+                slugs['category'].add(str(item['category']))
+        self._context['preloaded'] = {
+            Genre: Genre.objects.in_bulk(slugs['genre'], field_name='slug'),
+            Categories: Categories.objects.in_bulk(
+                slugs['category'], field_name='slug'
+            ),
+        }
+
+    def create(self, validated_data):
+        titles = [
+            Title(**{
+                field: value for field, value in item.items()
+                if field != 'genre'
+            })
+            for item in validated_data
+        ]
+        with transaction.atomic():
+            created = Title.objects.bulk_create(titles)
+            if created and created[0].pk is None:
+                # The backend can't return ids from bulk inserts (SQLite).
+                # The transaction holds the write lock since the first
+                # insert, so the new ids are consecutive.
+                last_id = Title.objects.order_by('-id').values_list(
+                    'id', flat=True
+                ).first()
+                first_id = last_id - len(created) + 1
+                for offset, title in enumerate(created):
+                    title.pk = first_id + offset
+            TitlesGenres.objects.bulk_create([
+                TitlesGenres(title=title, genre=genre)
+                for title, item in zip(created, validated_data)
+                for genre in dict.fromkeys(item['genre'])
+            ])
+        return created
+
+    def to_representation(self, data):
+        titles = list(data)
+        prefetch_related_objects(titles, 'genre')
+        return super().to_representation(titles)
+
+
 class TitlesSerializer(serializers.ModelSerializer):
-    """Allows creating titles."""
+    """Allows creating titles, one or many at a time."""
 
-    genre = serializers.SlugRelatedField(
+    genre = PreloadedSlugRelatedField(
         slug_field='slug', many=True, queryset=Genre.objects.all())
-    category = serializers.SlugRelatedField(
+    category = PreloadedSlugRelatedField(
         slug_field='slug', queryset=Categories.objects.all())
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('score_sum', 'score_count')
+        list_serializer_class = TitlesBulkSerializer
 
 
 class ReadOnlyTitleSerializer(serializers.ModelSerializer):
     """Shows objects while list command is used."""
 
-    rating = serializers.IntegerField(
-        source='reviews__score__avg', read_only=True
-    )
+    rating = serializers.IntegerField(read_only=True)
     genre = GenresSerializer(many=True, read_only=True)
     category = CategoriesSerializer()
 
@@ -53,3 +142,66 @@ class ReadOnlyTitleSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
         )
+
+
+class TitleRowListSerializer(serializers.ListSerializer):
+    """Loads the genres of the whole page with a single query."""
+
+    def to_representation(self, data):
+        rows = list(data)
+        genres = self.child.load_genres([row['id'] for row in rows])
+        return [
+            self.child.represent(row, genres[row['id']]) for row in rows
+        ]
+
+
+class TitleRowSerializer(serializers.BaseSerializer):
+    """
+    Fast read path for titles. Renders the same data as
+    ReadOnlyTitleSerializer from `values()` rows, without model instances
+    and per-field serializer objects.
+    """
+
+    row_fields = (
+        'id', 'name', 'year', 'rating', 'description',
+        'category__name', 'category__slug',
+    )
+
+    class Meta:
+        list_serializer_class = TitleRowListSerializer
+
+    @staticmethod
+    def load_genres(title_ids):
+        """Maps title ids to their genres ordered like Genre.Meta."""
+        genres = defaultdict(list)
+        links = TitlesGenres.objects.filter(
+            title_id__in=title_ids
+        ).order_by('genre__name', 'genre_id').values_list(
+            'title_id', 'genre__name', 'genre__slug'
+        )
+        for title_id, name, slug in links:
+            genres[title_id].append(
+                OrderedDict((('name', name), ('slug', slug)))
+            )
+        return genres
+
+    @staticmethod
+    def represent(row, genres):
+        category = None
+        if row['category__slug'] is not None:
+            category = OrderedDict((
+                ('name', row['category__name']),
+                ('slug', row['category__slug']),
+            ))
+        return OrderedDict((
+            ('id', row['id']),
+            ('name', row['name']),
+            ('year', row['year']),
+            ('rating', row['rating']),
+            ('description', row['description']),
+            ('genre', genres),
+            ('category', category),
+        ))
+
+    def to_representation(self, row):
+        return self.represent(row, self.load_genres([row['id']])[row['id']])
@@ -1,16 +1,26 @@
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, viewsets
-from rest_framework.exceptions import ParseError
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError, ValidationError
 
-from reviews.models import (Categories, Genre, Review,
+from reviews.models import (Categories, Comment, Genre, Review,
                             Title)
 from reviews.serializers import (ReviewSerializer, CommentSerializer)
+from users.permissions import RoleBasedPermission
 
+from .cache import CatalogCacheMixin, bump_after_commit
+from .conditional import (
+    COMMENTS_RESOURCE,
+    REVIEWS_RESOURCE,
+    ConditionalGetMixin
+)
+from .export import export_titles_ndjson
 from .filters import TitlesFilter
-from .mixins import CreateListDestroyViewSet
+from .mixins import CreateListDestroyViewSet, RelatedQuerysetMixin
 from .permissions import (
     IsAdminOrReadOnly,
     IsAdminModerAuthorOrReadOnly
@@ -18,12 +28,14 @@ from .permissions import (
 from .serializers import (
     CategoriesSerializer,
     GenresSerializer,
-    ReadOnlyTitleSerializer,
+    TitleRowSerializer,
+    TitlesBulkSerializer,
     TitlesSerializer
 )
 
 
-class CategoriesViewSet(CreateListDestroyViewSet):
+class CategoriesViewSet(ConditionalGetMixin, CatalogCacheMixin,
+                        CreateListDestroyViewSet):
     """Shows name and slug of a category."""
 
     queryset = Categories.objects.all()
@@ -32,9 +44,11 @@ class CategoriesViewSet(CreateListDestroyViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_resource = 'categories'
 
 
-class GenresViewSet(CreateListDestroyViewSet):
+class GenresViewSet(ConditionalGetMixin, CatalogCacheMixin,
+                    CreateListDestroyViewSet):
     """Shows name and slug of a genre."""
 
     queryset = Genre.objects.all()
@@ -43,52 +57,155 @@ class GenresViewSet(CreateListDestroyViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_resource = 'genres'
 
 
-class TitlesViewSet(viewsets.ModelViewSet):
+class TitlesViewSet(ConditionalGetMixin, CatalogCacheMixin,
+                    RelatedQuerysetMixin, viewsets.ModelViewSet):
     """Shows titles' name, score, category and genre."""
 
-    queryset = Title.objects.all().annotate(
-        Avg("reviews__score")
-    ).order_by("name")
+    queryset = Title.objects.all().order_by("name")
     serializer_class = TitlesSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = [DjangoFilterBackend]
     filterset_class = TitlesFilter
+    keyset_ordering = ("name", "id")
+    cache_resource = "titles"
+    export_chunk_size = 2000
+    # Roles allowed to the export by RoleBasedPermission.
+    allowed_roles = ("admin",)
+
+    def get_queryset(self):
+        """Reads flat rows for the fast serializer."""
+        queryset = super().get_queryset()
+        if self.action in ("retrieve", "list"):
+            return queryset.values(*TitleRowSerializer.row_fields)
+        return queryset
 
     def get_serializer_class(self):
         """Chooses serializer dependently on action."""
         if self.action in ("retrieve", "list"):
-            return ReadOnlyTitleSerializer
+            return TitleRowSerializer
         return TitlesSerializer
 
+    def get_serializer(self, *args, **kwargs):
+        """A JSON array posted to the list creates titles in bulk."""
+        if self.action == "create" and isinstance(kwargs.get("data"), list):
+            kwargs.update(many=True, allow_empty=False)
+        return super().get_serializer(*args, **kwargs)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def perform_create(self, serializer):
+        serializer.save()
+        if isinstance(serializer, TitlesBulkSerializer):
+            # bulk_create sends no post_save, notify the cache directly.
+            bump_after_commit(self.cache_resource)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(self.cached_response,
+                                         super().retrieve, request,
+                                         *args, **kwargs)
+
+    @action(detail=False, methods=["get"],
+            permission_classes=[RoleBasedPermission])
+    def export(self, request):
+        """Streams the whole catalog as NDJSON, resumable by `after`."""
+        after = request.query_params.get("after", "0")
+        try:
+            after = int(after)
+        except ValueError:
+            after = -1
+        if after < 0:
+            raise ValidationError({"after": "Ожидается id произведения."})
+        return StreamingHttpResponse(
+            export_titles_ndjson(after, self.export_chunk_size),
+            content_type="application/x-ndjson",
+        )
+
+
+class ReviewViewSet(ConditionalGetMixin, RelatedQuerysetMixin,
+                    viewsets.ModelViewSet):
+    queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminModerAuthorOrReadOnly,)
+    keyset_ordering = ("pub_date", "id")
 
     def get_queryset(self):
-        return Review.objects.filter(title=self.kwargs.get("title_id"))
+        return super().get_queryset().filter(
+            title=self.kwargs.get("title_id")
+        )
+
+    def get_version_resource(self):
+        return REVIEWS_RESOURCE.format(title_id=self.kwargs["title_id"])
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request,
+                                         *args, **kwargs)
+
+    def get_title(self):
+        """
+        The title of the route, loaded once per request together with
+        `reviewed`, which tells whether the user has already reviewed it.
+        """
+        if not hasattr(self, "_title"):
+            reviewed = Review.objects.filter(
+                title=OuterRef("pk"), author=self.request.user.id
+            )
+            self._title = get_object_or_404(
+                Title.objects.annotate(reviewed=Exists(reviewed))
+                .only("id", "name"),
+                pk=self.kwargs["title_id"],
+            )
+        return self._title
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs["title_id"])
+        title = self.get_title()
+        # The unique constraint still rejects a review written concurrently.
+        # The score totals of the title are shifted by the Review signals.
         try:
-            serializer.save(author=self.request.user, title=title)
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
         except IntegrityError:
             raise ParseError(detail="Автор уже оставил отзыв")
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, RelatedQuerysetMixin,
+                     viewsets.ModelViewSet):
     """Shows comments under review with it's author."""
+    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = (IsAdminModerAuthorOrReadOnly,)
+    keyset_ordering = ("pub_date", "id")
+
+    def get_review(self):
+        """
+        The review of the route, checked to belong to the title of the
+        route in the same query and loaded once per request.
+        """
+        if not hasattr(self, "_review"):
+            self._review = get_object_or_404(
+                Review.objects.only("id", "text", "title_id"),
+                pk=self.kwargs["review_id"],
+                title_id=self.kwargs["title_id"],
+            )
+        return self._review
 
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
-        return review.comments.all()
+        return super().get_queryset().filter(review=self.get_review())
+
+    def get_version_resource(self):
+        return COMMENTS_RESOURCE.format(review_id=self.kwargs["review_id"])
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request,
+                                         *args, **kwargs)
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id, title=title_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
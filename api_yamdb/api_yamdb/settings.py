@@ -74,10 +74,29 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'TEST': {'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3')},
     }
 }
 
 
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Lifetime of cached catalog responses, writes invalidate them earlier.
+CATALOG_CACHE_TIMEOUT = 60 * 5
+# Lifetime of the version counters behind the cached responses, ETag and
+# Last-Modified. Writes bump the counters in the cache of the writing
+# process only, so with the per-process LocMemCache other processes see
+# them at most this many seconds late. None keeps the counters forever
+# and is only safe when the cache is shared by all processes.
+CACHE_VERSION_TIMEOUT = CATALOG_CACHE_TIMEOUT
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -126,10 +145,19 @@ REST_FRAMEWORK = {
     ),
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication'
+        'users.authentication.CachedJWTAuthentication'
     ],
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_PAGINATION_CLASS':
-        'rest_framework.pagination.PageNumberPagination',
+        'api.pagination.OptionalKeysetPagination',
     'PAGE_SIZE': 5,
 }
 
@@ -138,8 +166,41 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Users authenticated by JWT that a process keeps in memory, and for how
+# many seconds. Writes through the ORM drop them at once, the timeout
+# bounds the staleness after writes made by other processes.
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_USER_CACHE_TTL = 60
+# Seconds after issuing during which the role claims of a token are
+# trusted without loading the user. Role changes bump a version kept in
+# the default cache; None trusts the claims for the token lifetime and
+# is only safe when that cache is shared by all processes (not LocMem).
+AUTH_CLAIMS_MAX_AGE = AUTH_USER_CACHE_TTL
+# Verified access tokens a process keeps until they expire.
+AUTH_TOKEN_CACHE_SIZE = 4096
+
+# Lifetime of a signup confirmation code in seconds and the number of
+# attempts to enter it.
+CONFIRMATION_CODE_TTL = 60 * 60
+CONFIRMATION_CODE_ATTEMPTS = 5
+
 # Email backend settings
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "fake_emails")
 
+# Delivery of the queued emails: 'thread' sends them from a background
+# thread of the process, 'sync' right after the request commits, 'command'
+# leaves them to `manage.py send_outbox --loop`.
+OUTBOX_DELIVERY = 'thread'
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_POLL_INTERVAL = 10
+# Delay before the first retry in seconds, doubled on every next one.
+OUTBOX_RETRY_DELAY = 30
+OUTBOX_MAX_ATTEMPTS = 5
+# Seconds a worker owns the messages it claimed. Messages of a worker that
+# died while sending become due again afterwards.
+OUTBOX_LEASE = 300
+
 DIR_FOR_CSV = os.path.join(BASE_DIR, 'static/data')
+# Row hashes of the last incremental csv2db load.
+CSV2DB_MANIFEST_DIR = os.path.join(BASE_DIR, 'csv2db_manifest')
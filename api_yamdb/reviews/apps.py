@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ReviewsConfig(AppConfig):
     name = 'reviews'
+
+    def ready(self):
+        from .models import connect_signals
+        from .search import create_search_index
+
+        connect_signals()
+        post_migrate.connect(create_search_index, sender=self)
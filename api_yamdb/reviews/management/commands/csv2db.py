@@ -1,18 +1,27 @@
 import csv
+import gzip
+import hashlib
+import io
+import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
 
 from django.conf import settings
-from django.core.management import BaseCommand
-from django.db import IntegrityError
+from django.core.management import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q
 
 from reviews.models import (
     Categories,
     Comment,
-    Genres,
+    Genre,
     TitlesGenres,
     Review,
-    Titles,
+    Title,
     User
 )
 
@@ -23,69 +32,580 @@ logging.basicConfig(
 
 FILES_CLASSES = {
     'category': Categories,
-    'genre': Genres,
-    'titles': Titles,
+    'genre': Genre,
+    'titles': Title,
     'genre_title': TitlesGenres,
     'users': User,
     'review': Review,
     'comments': Comment,
 }
 
+# CSV columns holding foreign keys: model attribute to fill and the model
+# the key points to.
 FIELDS = {
-    'category': ('category', Categories),
-    'title_id': ('title', Titles),
-    'genre_id': ('genre', Genres),
-    'author': ('author', User),
-    'review_id': ('review', Review),
+    'category': ('category_id', Categories),
+    'category_id': ('category_id', Categories),
+    'title_id': ('title_id', Title),
+    'genre_id': ('genre_id', Genre),
+    'author': ('author_id', User),
+    'review_id': ('review_id', Review),
 }
 
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PROGRESS_INTERVAL = 5
+DEFAULT_WORKERS = 4
+# How long a worker waits for another process to release the SQLite write
+# lock, in milliseconds.
+SQLITE_BUSY_TIMEOUT = 10 * 60 * 1000
+# SQLite has a single writer, and FTS5 writes fail instead of waiting when
+# another connection of the process writes concurrently, so the workers
+# take turns for their write transactions, each loading a whole table.
+sqlite_write_lock = threading.Lock()
+# Connection settings of the --fast mode. Foreign keys are checked against
+# the preloaded primary keys anyway, and a crashed initial load is simply
+# restarted, so the database doesn't have to survive it.
+FAST_PRAGMAS = (
+    'PRAGMA synchronous = OFF',
+    'PRAGMA cache_size = -65536',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA foreign_keys = OFF',
+)
+# How many ids of the rows rejected in --fast mode are reported.
+REPORTED_IDS = 20
+
+
+class CountingReader(io.RawIOBase):
+    """Binary file wrapper counting the bytes read from the file."""
+
+    def __init__(self, file):
+        self.file = file
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = self.file.readinto(buffer)
+        self.bytes_read += size
+        return size
+
+
+class Progress:
+    """Reports rows and bytes processed at most once per `interval`."""
+
+    def __init__(self, name, source, total_bytes, interval):
+        self.name = name
+        self.source = source
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.rows = 0
+        self.started = self.reported = time.monotonic()
+
+    def update(self, rows):
+        self.rows += rows
+        if time.monotonic() - self.reported >= self.interval:
+            self.report()
+
+    def report(self):
+        self.reported = time.monotonic()
+        megabytes = self.source.bytes_read / 2 ** 20
+        total = self.total_bytes / 2 ** 20
+        logging.info(f'{self.name}: {self.rows} строк, '
+                     f'{megabytes:.1f} из {total:.1f} МБ')
+
+    @property
+    def rows_per_second(self):
+        return self.rows / max(time.monotonic() - self.started, 1e-6)
+
+
+def get_csv_path(file_name):
+    """Path of the csv file, takes directory parameter from settings.
+    A gzip-compressed file is used when there is no plain one."""
+    csv_path = os.path.join(settings.DIR_FOR_CSV, file_name + '.csv')
+    if not os.path.exists(csv_path) and os.path.exists(csv_path + '.gz'):
+        return csv_path + '.gz'
+    return csv_path
+
+
+@contextmanager
+def open_csv_file(csv_path):
+    """Opens the csv file for streaming. Yields the header, a lazy
+    iterator of row dicts and the byte counter of the file."""
+    with open(csv_path, 'rb') as raw:
+        source = CountingReader(raw)
+        binary = io.BufferedReader(source)
+        if csv_path.endswith('.gz'):
+            binary = gzip.GzipFile(fileobj=binary)
+        file = io.TextIOWrapper(binary, encoding='utf-8', newline='')
+        reader = csv.reader(file)
+        header = next(reader, [])
+        yield header, (dict(zip(header, row)) for row in reader), source
 
-def open_csv_file(file_name):
-    """Function for opening the csv files,
-    takes directory parameter from settings."""
-    csv_file = file_name + '.csv'
-    csv_path = os.path.join(settings.DIR_FOR_CSV, csv_file)
+
+def iter_batches(items, batch_size):
+    """Groups an iterator into lists of at most `batch_size` items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_known_ids(header):
+    """Preloads the primary keys of the tables referenced by the file."""
+    models = {FIELDS[key][1] for key in header if key in FIELDS}
+    return {
+        model: set(model.objects.values_list('pk', flat=True))
+        for model in models
+    }
+
+
+def nullable_columns(class_name):
+    """Columns of the table whose empty csv cells stand for NULL."""
+    return frozenset(
+        field.attname for field in class_name._meta.concrete_fields
+        if field.null
+    )
+
+
+def change_foreign_values(data_csv, known_ids, nullable=frozenset()):
+    """Replaces foreign key columns with raw `_id` values, checked against
+    the preloaded primary keys instead of a query per value. Empty cells
+    of `nullable` columns become None, as db2csv writes NULL."""
+    for field_key in list(data_csv):
+        if field_key not in FIELDS:
+            if field_key in nullable and data_csv[field_key] == '':
+                data_csv[field_key] = None
+            continue
+        attname, model = FIELDS[field_key]
+        raw = data_csv.pop(field_key)
+        if raw == '' and attname in nullable:
+            data_csv[attname] = None
+            continue
+        value = int(raw)
+        if value not in known_ids[model]:
+            raise ValueError(
+                f'{model.__qualname__} с id={value} не существует'
+            )
+        data_csv[attname] = value
+    return data_csv
+
+
+@contextmanager
+def write_transaction():
+    """
+    Atomic block holding the database write lock from its start. On
+    SQLite the rows are read from the file within the block, so the loads
+    of the tables are serialized as a whole, parsing included; only the
+    preloading of foreign keys and the scheduling overlap.
+    """
+    if connection.vendor != 'sqlite':
+        with transaction.atomic():
+            yield
+        return
+    with sqlite_write_lock, connection.execute_wrapper(begin_immediate):
+        with transaction.atomic():
+            yield
+
+
+def begin_immediate(execute, sql, params, many, context):
+    """Takes the SQLite write lock when Django starts the transaction. A
+    deferred transaction waiting for another writer would fail with a
+    stale snapshot instead of waiting for the busy timeout."""
+    if sql == 'BEGIN':
+        sql = 'BEGIN IMMEDIATE'
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def keep_csv_dates(class_name, header):
+    """auto_now_add would replace the dates stored in the file."""
+    fields = [
+        field for field in class_name._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False) and field.name in header
+    ]
+    for field in fields:
+        field.auto_now_add = False
     try:
-        with (open(csv_path, encoding='utf-8')) as file:
-            return list(csv.reader(file))
-    except FileNotFoundError:
-        logging.error(f'Файл {csv_file} не найден.')
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def row_hash(row):
+    """Content hash of a csv row, compared between incremental loads."""
+    raw = '\x1f'.join(row.values()).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def stored_ids(class_name, ids):
+    """Ids of the batch that are stored in the table."""
+    stored = set()
+    size = connection.ops.bulk_batch_size(['pk'], ids)
+    for chunk in iter_batches(ids, size):
+        stored.update(
+            class_name.objects.filter(pk__in=chunk)
+            .values_list('pk', flat=True)
+        )
+    return stored
+
+
+def insert_rows(class_name, rows, known_ids, batch_size, progress,
+                fast=False):
+    """Inserts every row of the file. In the fast mode rows violating a
+    constraint are skipped instead of failing the table. The ids of every
+    batch are checked before and after the insert, and the skipped rows
+    are returned grouped by the reason: ids repeated in the file or
+    already stored, values of the unique fields taken by a stored row, or
+    other constraints (NOT NULL, CHECK) SQLite ignores the rows for."""
+    nullable = nullable_columns(class_name)
+    objects = (
+        class_name(**change_foreign_values(row, known_ids, nullable))
+        for row in rows
+    )
+    unique = unique_fields(class_name)
+    rejected = {
+        'нарушена уникальность (id)': [],
+        f'нарушена уникальность ({unique})': [],
+        'нарушены другие ограничения': [],
+    }
+    for batch in iter_batches(objects, batch_size):
+        if fast:
+            ids = [int(obj.pk) for obj in batch]
+            existing = stored_ids(class_name, ids)
+        class_name.objects.bulk_create(batch, ignore_conflicts=fast)
+        if fast:
+            stored = stored_ids(class_name, ids) - existing
+            # Earlier batches are committed to `existing` already, only
+            # the ids repeated within the batch have to be tracked.
+            loaded = set()
+            for obj, pk in zip(batch, ids):
+                if pk in loaded or pk in existing:
+                    reason = 'нарушена уникальность (id)'
+                elif pk in stored:
+                    loaded.add(pk)
+                    continue
+                elif unique and has_unique_conflict(obj):
+                    reason = f'нарушена уникальность ({unique})'
+                else:
+                    reason = 'нарушены другие ограничения'
+                rejected[reason].append(pk)
+        progress.update(len(batch))
+    return {reason: ids for reason, ids in rejected.items() if ids}
+
+
+def use_fast_pragmas():
+    """Tunes the connection for the bulk load. The settings last until
+    the connection of the worker is closed."""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for pragma in FAST_PRAGMAS:
+                cursor.execute(pragma)
+
+
+def unique_groups(class_name):
+    """Field sets the table keeps unique, besides the primary key."""
+    groups = [
+        (field.name,) for field in class_name._meta.concrete_fields
+        if field.unique and not field.primary_key
+    ]
+    groups += [
+        tuple(constraint.fields)
+        for constraint in class_name._meta.constraints
+        if hasattr(constraint, 'fields')
+    ]
+    return groups
+
+
+def unique_fields(class_name):
+    """Names of the field sets the table keeps unique."""
+    return ', '.join(
+        '+'.join(group) for group in unique_groups(class_name)
+    )
+
+
+def has_unique_conflict(obj):
+    """Whether another stored row has the values of a unique field set of
+    the object. Only asked about the rows the fast mode skipped."""
+    model = type(obj)
+    condition = Q()
+    for group in unique_groups(model):
+        condition |= Q(**{
+            name: getattr(obj, model._meta.get_field(name).attname)
+            for name in group
+        })
+    return model.objects.filter(condition).exclude(pk=obj.pk).exists()
+
+
+@contextmanager
+def deferred_indexes(models):
+    """
+    Drops the secondary indexes of the tables for the load and creates
+    them again afterwards, which is cheaper than updating them on every
+    insert. SQLite keeps unique columns and constraints in the table
+    definition as automatic indexes, which have no SQL and stay in place,
+    so the indexes created again can't fail on duplicates.
+    """
+    if connection.vendor != 'sqlite':
+        yield
         return
+    tables = [model._meta.db_table for model in models]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT name, sql FROM sqlite_master WHERE type = %s '
+            'AND sql IS NOT NULL AND tbl_name IN ({})'.format(
+                ', '.join(['%s'] * len(tables))
+            ),
+            ['index', *tables]
+        )
+        indexes = cursor.fetchall()
+        for name, sql in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+    connection.close()
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name, sql in indexes:
+                cursor.execute(sql)
+        logging.info(f'Индексы созданы заново: {len(indexes)}.')
 
 
-def change_foreign_values(data_csv):
-    """Make a set of data correctly sorted with its fields"""
-    data_csv_copy = data_csv.copy()
-    for field_key, field_value in data_csv.items():
-        if field_key in FIELDS.keys():
-            field_key0 = FIELDS[field_key][0]
-            data_csv_copy[field_key0] = FIELDS[field_key][1].objects.get(
-                pk=field_value)
-    return data_csv_copy
+class TableSync:
+    """
+    Incremental load of a table. The rows are compared with the content
+    hashes stored in the manifest by the previous load: new rows are
+    inserted, changed rows are updated and, with `delete`, the rows missing
+    from the file are deleted. Rows of the table absent from the manifest
+    count as changed.
+    """
 
+    def __init__(self, file_name, class_name, header, delete=False):
+        self.path = os.path.join(settings.CSV2DB_MANIFEST_DIR,
+                                 f'{file_name}.json')
+        self.class_name = class_name
+        self.fields = [
+            FIELDS[key][0] if key in FIELDS else key
+            for key in header if key != 'id'
+        ]
+        self.delete = delete
+        self.hashes = {}
+        self.inserted = self.updated = self.deleted = 0
 
-def load_csv(file_name, class_name):
-    """Main function"""
+    def read_manifest(self):
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                hashes = json.load(file)
+        except FileNotFoundError:
+            return {}
+        return {int(pk): value for pk, value in hashes.items()}
+
+    def save_manifest(self):
+        """Replaces the manifest once the table is committed."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self.hashes, file)
+        os.replace(temporary, self.path)
+
+    def run(self, rows, known_ids, batch_size, progress):
+        manifest = self.read_manifest()
+        nullable = nullable_columns(self.class_name)
+        existing = set(
+            self.class_name.objects.values_list('pk', flat=True)
+        )
+        for batch in iter_batches(rows, batch_size):
+            new, changed = [], []
+            for row in batch:
+                pk, digest = int(row['id']), row_hash(row)
+                self.hashes[pk] = digest
+                if pk in existing and manifest.get(pk) == digest:
+                    continue
+                obj = self.class_name(
+                    **change_foreign_values(row, known_ids, nullable)
+                )
+                (changed if pk in existing else new).append(obj)
+            self.class_name.objects.bulk_create(new)
+            if changed and self.fields:
+                self.class_name.objects.bulk_update(changed, self.fields)
+            self.inserted += len(new)
+            self.updated += len(changed)
+            progress.update(len(batch))
+        if self.delete:
+            vanished = sorted(existing - self.hashes.keys())
+            for chunk in iter_batches(vanished, batch_size):
+                self.class_name.objects.filter(pk__in=chunk).delete()
+            self.deleted = len(vanished)
+
+
+def load_csv(file_name, class_name, batch_size=DEFAULT_BATCH_SIZE,
+             progress_interval=DEFAULT_PROGRESS_INTERVAL,
+             incremental=False, delete=False, fast=False):
+    """Main function. Streams the file through read, parse, transform
+    and batch insert stages, holding at most one batch in memory.
+    In the incremental mode only the difference with the previous load
+    is written."""
     table_not_loaded = f'Таблица {class_name.__qualname__} не загружена.'
     table_loaded = f'Таблица {class_name.__qualname__} загружена.'
-    data = open_csv_file(file_name)
-    rows = data[1:]
-    for row in rows:
-        data_csv = dict(zip(data[0], row))
-        data_csv = change_foreign_values(data_csv)
+    csv_path = get_csv_path(file_name)
+    if not os.path.exists(csv_path):
+        logging.error(f'Файл {os.path.basename(csv_path)} не найден.')
+        return False
+    with open_csv_file(csv_path) as (header, rows, source):
+        known_ids = load_known_ids(header)
+        progress = Progress(class_name.__qualname__, source,
+                            os.path.getsize(csv_path), progress_interval)
+        sync = (
+            TableSync(file_name, class_name, header, delete)
+            if incremental else None
+        )
+        if fast:
+            use_fast_pragmas()
+        rejected = {}
         try:
-            table = class_name(**data_csv)
-            table.save()
-        except (ValueError, IntegrityError) as error:
+            with keep_csv_dates(class_name, header), write_transaction():
+                if sync is None:
+                    rejected = insert_rows(class_name, rows, known_ids,
+                                           batch_size, progress, fast)
+                else:
+                    sync.run(rows, known_ids, batch_size, progress)
+                if class_name is Review:
+                    Title.refresh_review_scores()
+        except (ValueError, DatabaseError) as error:
             logging.error(f'Ошибка в загружаемых данных. {error}. '
                           f'{table_not_loaded}')
-            break
-    logging.info(table_loaded)
+            return False
+    skipped = sum(len(ids) for ids in rejected.values())
+    logging.info(f'{table_loaded} Строк: {progress.rows - skipped}, '
+                 f'{progress.rows_per_second:.0f} строк/с.')
+    for reason, pks in rejected.items():
+        ids = ', '.join(map(str, pks[:REPORTED_IDS]))
+        logging.warning(f'{class_name.__qualname__}: не загружено строк '
+                        f'{len(pks)}, {reason}. id: {ids}')
+    if sync is not None:
+        sync.save_manifest()
+        logging.info(f'{class_name.__qualname__}: новых строк '
+                     f'{sync.inserted}, изменённых {sync.updated}, '
+                     f'удалённых {sync.deleted}.')
+    return True
+
+
+def table_dependencies(files_classes):
+    """Maps every file to the files of the tables its foreign keys
+    reference, derived from the model fields."""
+    file_of = {model: name for name, model in files_classes.items()}
+    return {
+        name: {
+            file_of[field.related_model]
+            for field in model._meta.concrete_fields
+            if field.many_to_one and field.related_model in file_of
+            and field.related_model is not model
+        }
+        for name, model in files_classes.items()
+    }
+
+
+def enable_wal():
+    """Lets readers proceed while another table is being written. The
+    journal mode is persistent and needs an exclusive lock, so it is set
+    once before the workers start. The connection of the calling thread is
+    closed so that it holds no lock while the workers write."""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode = WAL')
+        connection.close()
+
+
+def load_in_worker(file_name, class_name, *args):
+    """Loads a table on its own thread and database connection."""
+    try:
+        if connection.vendor == 'sqlite':
+            # Writers of other processes are waited for instead of failing.
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT}')
+        return load_csv(file_name, class_name, *args)
+    finally:
+        connection.close()
+
+
+def load_tables(files_classes, workers, *args):
+    """Loads the tables concurrently. A table starts once all tables it
+    references are committed and is skipped if one of them failed."""
+    pending = table_dependencies(files_classes)
+    loaded, failed, running = set(), set(), {}
+    enable_wal()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            for name, parents in list(pending.items()):
+                if parents & failed:
+                    logging.error(f'Таблица {files_classes[name].__qualname__}'
+                                  f' пропущена: не загружены зависимости.')
+                    failed.add(name)
+                elif parents <= loaded:
+                    logging.info(f'Загрузка таблицы '
+                                 f'{files_classes[name].__qualname__}')
+                    future = executor.submit(
+                        load_in_worker, name, files_classes[name], *args
+                    )
+                    running[future] = name
+                else:
+                    continue
+                del pending[name]
+            if not running:
+                # Nothing left can finish: the rest wait on each other.
+                for name in pending:
+                    logging.error(f'Таблица {files_classes[name].__qualname__}'
+                                  f' пропущена: циклические зависимости.')
+                failed.update(pending)
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                (loaded if future.result() else failed).add(name)
+    return loaded
 
 
 class Command(BaseCommand):
+    help = 'Загружает таблицы из csv файлов каталога DIR_FOR_CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном INSERT.'
+        )
+        parser.add_argument(
+            '--progress-interval', type=float,
+            default=DEFAULT_PROGRESS_INTERVAL,
+            help='Интервал вывода прогресса загрузки, в секундах.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=DEFAULT_WORKERS,
+            help='Количество таблиц, загружаемых одновременно.'
+        )
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Записывает только новые и изменённые строки.'
+        )
+        parser.add_argument(
+            '--delete', action='store_true',
+            help='С --incremental удаляет строки, которых нет в файлах.'
+        )
+        parser.add_argument(
+            '--fast', action='store_true',
+            help='Первичная загрузка: без fsync и вторичных индексов, '
+                 'строки с нарушением уникальности пропускаются.'
+        )
 
     def handle(self, *args, **options):
-        for key, value in FILES_CLASSES.items():
-            logging.info(f'Загрузка таблицы {value.__qualname__}')
-            load_csv(key, value)
+        if options['fast'] and options['incremental']:
+            raise CommandError('--fast нельзя использовать с --incremental.')
+        with (deferred_indexes(FILES_CLASSES.values()) if options['fast']
+              else nullcontext()):
+            load_tables(FILES_CLASSES, options['workers'],
+                        options['batch_size'], options['progress_interval'],
+                        options['incremental'], options['delete'],
+                        options['fast'])
@@ -0,0 +1,113 @@
+import csv
+import datetime
+import gzip
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management import BaseCommand
+from django.db import connection
+
+from reviews.management.commands.csv2db import FIELDS, FILES_CLASSES
+
+# Columns of every file, in the layout read by csv2db.
+HEADERS = {
+    'category': ('id', 'name', 'slug'),
+    'genre': ('id', 'name', 'slug'),
+    'titles': ('id', 'name', 'year', 'category_id', 'description'),
+    'genre_title': ('id', 'title_id', 'genre_id'),
+    'users': ('id', 'username', 'email', 'role', 'bio', 'first_name',
+              'last_name'),
+    'review': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments': ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_WORKERS = 4
+
+
+def format_value(value):
+    """Dates in ISO 8601, as in the source files. NULL is written as an
+    empty cell, which csv2db reads back as None for nullable columns."""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def open_output(path, compress):
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def export_table(file_name, class_name, directory,
+                 chunk_size=DEFAULT_CHUNK_SIZE, compress=False):
+    """Streams a table into its csv file with a server-side cursor. The
+    file is written under a temporary name and replaced when complete."""
+    columns = HEADERS[file_name]
+    fields = [FIELDS[key][0] if key in FIELDS else key for key in columns]
+    extension = '.csv.gz' if compress else '.csv'
+    path = os.path.join(directory, file_name + extension)
+    temporary = path + '.tmp'
+    started = time.monotonic()
+    rows = class_name.objects.order_by('pk').values_list(*fields).iterator(
+        chunk_size=chunk_size
+    )
+    count = 0
+    with open_output(temporary, compress) as file:
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([format_value(value) for value in row])
+            count += 1
+    os.replace(temporary, path)
+    speed = count / max(time.monotonic() - started, 1e-6)
+    logging.info(f'Таблица {class_name.__qualname__} выгружена. '
+                 f'Строк: {count}, {speed:.0f} строк/с.')
+    return count
+
+
+def export_in_worker(*args):
+    """Exports a table on its own thread and database connection."""
+    try:
+        return export_table(*args)
+    finally:
+        connection.close()
+
+
+def export_tables(files_classes, directory, workers, *args):
+    """Exports the tables in parallel, returns the row counts."""
+    os.makedirs(directory, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            name: executor.submit(export_in_worker, name, class_name,
+                                  directory, *args)
+            for name, class_name in files_classes.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+class Command(BaseCommand):
+    help = 'Выгружает таблицы в csv файлы в формате csv2db.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directory', help='Каталог для csv файлов.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за один раз.'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжимает файлы в формат gzip.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=DEFAULT_WORKERS,
+            help='Количество таблиц, выгружаемых одновременно.'
+        )
+
+    def handle(self, *args, **options):
+        export_tables(FILES_CLASSES, options['directory'], options['workers'],
+                      options['chunk_size'], options['gzip'])
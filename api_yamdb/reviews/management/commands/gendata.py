@@ -0,0 +1,256 @@
+import csv
+import datetime
+import logging
+import os
+import random
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import DatabaseError
+from django.utils import timezone
+
+from reviews.management.commands.csv2db import (
+    DEFAULT_BATCH_SIZE,
+    FIELDS,
+    FILES_CLASSES,
+    iter_batches,
+    keep_csv_dates,
+    write_transaction
+)
+from reviews.management.commands.db2csv import (
+    HEADERS,
+    format_value,
+    open_output
+)
+from reviews.models import Review, Title
+
+SYLLABLES = (
+    'ба', 'ве', 'го', 'да', 'же', 'за', 'ки', 'ла', 'ми', 'но', 'по', 'ра',
+    'си', 'ту', 'фе', 'ха', 'це', 'чу', 'ша', 'ко', 'ли', 'мо', 'ни', 'ре',
+    'ст', 'тра', 'вло', 'кра', 'дми', 'про', 'слав', 'мир', 'горд', 'ан',
+)
+ROLES = ('user', 'user', 'user', 'user', 'moderator', 'admin')
+# Exponent of the Pareto distribution of reviews per title and comments
+# per review: a few titles collect most of the reviews.
+POWER_LAW_ALPHA = 1.5
+FIRST_DATE = datetime.datetime(2015, 1, 1, tzinfo=timezone.utc)
+DATE_RANGE = datetime.timedelta(days=8 * 365)
+
+
+class Dataset:
+    """
+    Seeded synthetic data in the csv2db layout. Every table has its own
+    random generator, so a table is the same whether or not the others
+    are generated, and the comments replay the reviews they belong to
+    instead of keeping them in memory.
+    """
+
+    def __init__(self, users, categories, genres, titles,
+                 reviews_per_title, comments_per_review, seed=0):
+        self.counts = {
+            'users': users,
+            'category': categories,
+            'genre': genres,
+            'titles': titles,
+        }
+        self.reviews_per_title = reviews_per_title
+        self.comments_per_review = comments_per_review
+        self.seed = seed
+
+    def random(self, table):
+        return random.Random(f'{self.seed}:{table}')
+
+    @staticmethod
+    def word(rng, syllables=(2, 4)):
+        return ''.join(
+            rng.choice(SYLLABLES) for _ in range(rng.randint(*syllables))
+        )
+
+    def phrase(self, rng, words):
+        text = ' '.join(self.word(rng) for _ in range(rng.randint(*words)))
+        return text.capitalize()
+
+    @staticmethod
+    def power_law(rng, mean, limit):
+        """Count with the given mean and a heavy tail."""
+        scale = mean * (POWER_LAW_ALPHA - 1) / POWER_LAW_ALPHA
+        return min(int(scale * rng.paretovariate(POWER_LAW_ALPHA)), limit)
+
+    @staticmethod
+    def date(rng, after=FIRST_DATE):
+        left = FIRST_DATE + DATE_RANGE - after
+        return after + left * rng.random()
+
+    def users(self):
+        rng = self.random('users')
+        for pk in range(1, self.counts['users'] + 1):
+            yield {
+                'id': pk, 'username': f'user{pk}',
+                'email': f'user{pk}@yamdb.fake', 'role': rng.choice(ROLES),
+                'bio': self.phrase(rng, (0, 12)),
+                'first_name': self.word(rng).capitalize(),
+                'last_name': self.word(rng, (3, 5)).capitalize(),
+            }
+
+    def slugged(self, table, prefix):
+        rng = self.random(table)
+        for pk in range(1, self.counts[table] + 1):
+            yield {'id': pk, 'name': self.phrase(rng, (1, 2)),
+                   'slug': f'{prefix}-{pk}'}
+
+    def category(self):
+        return self.slugged('category', 'category')
+
+    def genre(self):
+        return self.slugged('genre', 'genre')
+
+    def titles(self):
+        rng = self.random('titles')
+        categories = self.counts['category']
+        for pk in range(1, self.counts['titles'] + 1):
+            yield {
+                'id': pk, 'name': self.phrase(rng, (1, 4)),
+                'year': rng.randint(1900, FIRST_DATE.year),
+                'category_id': rng.randint(1, categories),
+                'description': self.phrase(rng, (0, 30)) or None,
+            }
+
+    def genre_title(self):
+        rng = self.random('genre_title')
+        genres = range(1, self.counts['genre'] + 1)
+        pk = 0
+        for title_id in range(1, self.counts['titles'] + 1):
+            for genre_id in rng.sample(genres, min(rng.randint(1, 3),
+                                                   len(genres))):
+                pk += 1
+                yield {'id': pk, 'title_id': title_id, 'genre_id': genre_id}
+
+    def review(self):
+        rng = self.random('review')
+        users = range(1, self.counts['users'] + 1)
+        pk = 0
+        for title_id in range(1, self.counts['titles'] + 1):
+            count = self.power_law(rng, self.reviews_per_title, len(users))
+            # A user reviews a title once.
+            for author in rng.sample(users, count):
+                pk += 1
+                yield {
+                    'id': pk, 'title_id': title_id,
+                    'text': self.phrase(rng, (3, 40)), 'author': author,
+                    'score': rng.randint(1, 10), 'pub_date': self.date(rng),
+                }
+
+    def comments(self):
+        rng = self.random('comments')
+        users = self.counts['users']
+        pk = 0
+        for review in self.review():
+            count = self.power_law(rng, self.comments_per_review, users)
+            for _ in range(count):
+                pk += 1
+                yield {
+                    'id': pk, 'review_id': review['id'],
+                    'text': self.phrase(rng, (1, 25)),
+                    'author': rng.randint(1, users),
+                    'pub_date': self.date(rng, review['pub_date']),
+                }
+
+    def rows(self, file_name):
+        return getattr(self, file_name)()
+
+
+def write_csv(dataset, file_name, directory, compress=False):
+    """Writes a generated table as a csv2db input file."""
+    extension = '.csv.gz' if compress else '.csv'
+    path = os.path.join(directory, file_name + extension)
+    columns = HEADERS[file_name]
+    count = 0
+    with open_output(path, compress) as file:
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(columns)
+        for row in dataset.rows(file_name):
+            writer.writerow([format_value(row[key]) for key in columns])
+            count += 1
+    return count
+
+
+def insert_table(dataset, file_name, class_name, batch_size):
+    """Inserts a generated table with bulk_create in one transaction."""
+    header = HEADERS[file_name]
+    objects = (
+        class_name(**{
+            FIELDS[key][0] if key in FIELDS else key: value
+            for key, value in row.items()
+        })
+        for row in dataset.rows(file_name)
+    )
+    count = 0
+    with keep_csv_dates(class_name, header), write_transaction():
+        for batch in iter_batches(objects, batch_size):
+            class_name.objects.bulk_create(batch)
+            count += len(batch)
+        if class_name is Review:
+            Title.refresh_review_scores()
+    return count
+
+
+class Command(BaseCommand):
+    help = ('Генерирует тестовый набор данных в базу или в csv файлы '
+            'для csv2db.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument(
+            '--reviews-per-title', type=float, default=10,
+            help='Среднее количество отзывов на произведение.'
+        )
+        parser.add_argument(
+            '--comments-per-review', type=float, default=2,
+            help='Среднее количество комментариев к отзыву.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            help='Каталог для csv файлов. Без него данные пишутся в базу.'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжимает csv файлы в формат gzip.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном INSERT.'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['categories'],
+               options['genres']) < 1:
+            raise CommandError('Нужны хотя бы один пользователь, одна '
+                               'категория и один жанр.')
+        dataset = Dataset(
+            options['users'], options['categories'], options['genres'],
+            options['titles'], options['reviews_per_title'],
+            options['comments_per_review'], options['seed'],
+        )
+        if options['output']:
+            os.makedirs(options['output'], exist_ok=True)
+        for file_name, class_name in FILES_CLASSES.items():
+            started = time.monotonic()
+            if options['output']:
+                count = write_csv(dataset, file_name, options['output'],
+                                  options['gzip'])
+            else:
+                try:
+                    count = insert_table(dataset, file_name, class_name,
+                                         options['batch_size'])
+                except DatabaseError as error:
+                    raise CommandError(
+                        f'Таблица {class_name.__qualname__} не записана: '
+                        f'{error}. Генератор пишет в пустую базу.'
+                    )
+            speed = count / max(time.monotonic() - started, 1e-6)
+            logging.info(f'{class_name.__qualname__}: {count} строк, '
+                         f'{speed:.0f} строк/с.')
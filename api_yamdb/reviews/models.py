@@ -1,7 +1,14 @@
+import threading
+
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
 
+from .signals import title_rating_changed
 from .validators import year_validator
 
 User = get_user_model()
@@ -52,13 +59,60 @@ class Title(models.Model):
     category = models.ForeignKey(Categories, on_delete=models.SET_NULL,
                                  related_name='titles', null=True)
     rating = models.PositiveSmallIntegerField(
-        verbose_name='Оценка пользователей', null=True, default=None)
+        verbose_name='Оценка пользователей', null=True, default=None,
+        editable=False)
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок', default=0, editable=False)
+    score_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок', default=0, editable=False)
     description = models.TextField(verbose_name='Описание', blank=True,
                                    null=True)
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def apply_review_score(cls, title_id, score_delta, count_delta=0):
+        """Shifts the stored score totals of a title and re-derives
+        its rating in a single UPDATE, so it is safe under concurrent
+        review writes.
+        """
+        new_sum = models.F('score_sum') + score_delta
+        new_count = models.F('score_count') + count_delta
+        cls.objects.filter(pk=title_id).update(
+            score_sum=new_sum,
+            score_count=new_count,
+            rating=models.Case(
+                models.When(score_count=-count_delta, then=None),
+                default=new_sum / new_count,
+                output_field=models.PositiveSmallIntegerField(),
+            ),
+        )
+        title_rating_changed.send(sender=cls, title_id=title_id)
+
+    @classmethod
+    def refresh_review_scores(cls):
+        """Recounts the stored score totals of all titles from reviews,
+        for reviews written around ReviewViewSet, e.g. by bulk loads.
+        """
+        reviews = Review.objects.filter(
+            title=models.OuterRef('pk')
+        ).order_by().values('title')
+        cls.objects.update(
+            score_sum=Coalesce(models.Subquery(
+                reviews.annotate(total=models.Sum('score')).values('total')
+            ), 0),
+            score_count=Coalesce(models.Subquery(
+                reviews.annotate(total=models.Count('id')).values('total')
+            ), 0),
+            rating=models.Subquery(
+                reviews.annotate(
+                    rating=models.Sum('score') / models.Count('id')
+                ).values('rating'),
+                output_field=models.PositiveSmallIntegerField(),
+            ),
+        )
+
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
@@ -150,3 +204,90 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['pub_date']
+
+
+def _review_saving(sender, instance, raw=False, **kwargs):
+    """Remembers the stored score and title of a review being changed."""
+    instance._stored_score = None
+    if raw or instance.pk is None:
+        return
+    stored = Review.objects.filter(pk=instance.pk)
+    if transaction.get_connection().in_atomic_block:
+        stored = stored.select_for_update()
+    instance._stored_score = stored.values_list('title_id', 'score').first()
+
+
+def _review_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    stored = getattr(instance, '_stored_score', None)
+    if stored is None:
+        Title.apply_review_score(instance.title_id, instance.score, 1)
+    elif stored[0] != instance.title_id:
+        Title.apply_review_score(stored[0], -stored[1], -1)
+        Title.apply_review_score(instance.title_id, instance.score, 1)
+    elif stored[1] != instance.score:
+        Title.apply_review_score(instance.title_id,
+                                 instance.score - stored[1])
+
+
+_cascade = threading.local()
+
+
+def _cascade_sources():
+    """
+    Titles and authors the deletes of the current transaction cascade
+    from. Django sends pre_delete for every collected object before the
+    rows are deleted, so the cascaded reviews can be told apart. The
+    sets are bound to the list of commit hooks of the transaction, which
+    is replaced when it ends, so a rolled back delete leaves nothing.
+    """
+    marker = transaction.get_connection().run_on_commit
+    if getattr(_cascade, 'marker', None) is not marker:
+        _cascade.marker = marker
+        _cascade.titles, _cascade.authors = set(), set()
+    return _cascade
+
+
+def _title_deleting(sender, instance, **kwargs):
+    # The totals are deleted with the title.
+    _cascade_sources().titles.add(instance.pk)
+
+
+def _author_deleting(sender, instance, **kwargs):
+    """Takes the reviews of a deleted user off their titles, one UPDATE
+    per title instead of one per review."""
+    totals = Review.objects.filter(author=instance).order_by().values(
+        'title_id'
+    ).annotate(total=models.Sum('score'), count=models.Count('id'))
+    for row in totals:
+        Title.apply_review_score(row['title_id'], -row['total'],
+                                 -row['count'])
+    _cascade_sources().authors.add(instance.pk)
+
+
+def _review_deleted(sender, instance, **kwargs):
+    sources = _cascade_sources()
+    if (
+        instance.title_id in sources.titles
+        or instance.author_id in sources.authors
+    ):
+        return
+    Title.apply_review_score(instance.title_id, -instance.score, -1)
+
+
+def connect_signals():
+    """
+    Keeps the score totals of titles in step with every review write done
+    through model instances, including cascades and the admin site.
+    """
+    pre_save.connect(_review_saving, sender=Review,
+                     dispatch_uid='review_scores')
+    post_save.connect(_review_saved, sender=Review,
+                      dispatch_uid='review_scores')
+    post_delete.connect(_review_deleted, sender=Review,
+                        dispatch_uid='review_scores')
+    pre_delete.connect(_title_deleting, sender=Title,
+                       dispatch_uid='review_scores')
+    pre_delete.connect(_author_deleting, sender=User,
+                       dispatch_uid='review_scores')
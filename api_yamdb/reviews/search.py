@@ -0,0 +1,100 @@
+import re
+
+from django.db import OperationalError, connection, connections
+from django.db.models import Q
+
+from .models import Title
+
+TITLE_TABLE = Title._meta.db_table
+SEARCH_TABLE = f'{TITLE_TABLE}_fts'
+
+# External content FTS5 index over the titles table. The triggers keep it
+# in sync with every write, including bulk_create and raw loads.
+SEARCH_INDEX_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS "{SEARCH_TABLE}" USING fts5('
+    f'name, description, content="{TITLE_TABLE}", content_rowid="id", '
+    f'tokenize="unicode61")',
+    f'CREATE TRIGGER IF NOT EXISTS "{SEARCH_TABLE}_ai" '
+    f'AFTER INSERT ON "{TITLE_TABLE}" BEGIN '
+    f'INSERT INTO "{SEARCH_TABLE}"(rowid, name, description) '
+    f'VALUES (new.id, new.name, new.description); END',
+    f'CREATE TRIGGER IF NOT EXISTS "{SEARCH_TABLE}_ad" '
+    f'AFTER DELETE ON "{TITLE_TABLE}" BEGIN '
+    f'INSERT INTO "{SEARCH_TABLE}"("{SEARCH_TABLE}", rowid, name, '
+    f'description) VALUES (\'delete\', old.id, old.name, old.description); '
+    f'END',
+    f'CREATE TRIGGER IF NOT EXISTS "{SEARCH_TABLE}_au" '
+    f'AFTER UPDATE OF name, description ON "{TITLE_TABLE}" BEGIN '
+    f'INSERT INTO "{SEARCH_TABLE}"("{SEARCH_TABLE}", rowid, name, '
+    f'description) VALUES (\'delete\', old.id, old.name, old.description); '
+    f'INSERT INTO "{SEARCH_TABLE}"(rowid, name, description) '
+    f'VALUES (new.id, new.name, new.description); END',
+)
+
+_search_index_ready = False
+
+
+def search_index_exists():
+    """Checks once per process that the FTS5 index has been created."""
+    global _search_index_ready
+    if not _search_index_ready and connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                "AND name = %s", [SEARCH_TABLE]
+            )
+            _search_index_ready = cursor.fetchone() is not None
+    return _search_index_ready
+
+
+def create_search_index(using='default', **kwargs):
+    """
+    Creates the FTS5 index and its triggers after migrate. Existing titles
+    are indexed when the index is created for the first time.
+    """
+    db = connections[using]
+    if db.vendor != 'sqlite':
+        return
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [SEARCH_TABLE]
+        )
+        created = cursor.fetchone() is None
+        try:
+            for statement in SEARCH_INDEX_SQL:
+                cursor.execute(statement)
+        except OperationalError:
+            # SQLite was built without FTS5, search falls back to LIKE.
+            return
+        if created:
+            cursor.execute(
+                f'INSERT INTO "{SEARCH_TABLE}"("{SEARCH_TABLE}") '
+                f"VALUES ('rebuild')"
+            )
+
+
+def build_match_query(value):
+    """Turns user input into an FTS5 query of quoted prefix terms."""
+    words = re.findall(r'\w+', value)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_titles(queryset, value):
+    """Filters titles by the search query, best matches first."""
+    match = build_match_query(value)
+    if not match:
+        return queryset
+    if not search_index_exists():
+        return queryset.filter(
+            Q(name__icontains=value) | Q(description__icontains=value)
+        )
+    return queryset.extra(
+        select={'search_rank': f'"{SEARCH_TABLE}".rank'},
+        tables=[SEARCH_TABLE],
+        where=[
+            f'"{SEARCH_TABLE}" MATCH %s',
+            f'"{SEARCH_TABLE}".rowid = "{TITLE_TABLE}"."id"',
+        ],
+        params=[match],
+    ).order_by('search_rank', 'id')
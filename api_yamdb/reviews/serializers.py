@@ -1,9 +1,8 @@
-from django.shortcuts import get_object_or_404
 from rest_framework.exceptions import ValidationError
 
 from rest_framework import serializers
 
-from .models import Comment, Review, Title
+from .models import Comment, Review
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -19,11 +18,8 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         request = self.context['request']
-        author = request.user
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
         if request.method == 'POST':
-            if Review.objects.filter(title=title, author=author).exists():
+            if self.context['view'].get_title().reviewed:
                 raise ValidationError('Вы не можете добавить более'
                                       'одного отзыва на произведение')
         return data
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent by Title.apply_review_score after the stored rating of a title has
+# been shifted. Queryset updates do not send post_save, so consumers that
+# depend on the rating listen to this signal instead.
+title_rating_changed = Signal(providing_args=['title_id'])
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
 from reviews.models import User
+from users.models import OutboxMessage
 
 
 admin.site.register(User)
+admin.site.register(OutboxMessage)
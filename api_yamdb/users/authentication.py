@@ -0,0 +1,165 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from . import claims
+from .models import User
+
+
+class LRUCache:
+    """
+    Thread-safe mapping of the process, bounded in size. Entries expire
+    after `ttl` seconds. Every `delete` starts a new generation, and a value
+    loaded in an earlier generation is not stored, so a reader racing with
+    an invalidation can't put the old value back.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= time.monotonic():
+                del self.data[key]
+                return None
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None, generation=None):
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            ttl = self.ttl if ttl is None else ttl
+            self.data[key] = (time.monotonic() + ttl, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.generation += 1
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.data.clear()
+
+
+user_cache = LRUCache(settings.AUTH_USER_CACHE_SIZE,
+                      settings.AUTH_USER_CACHE_TTL)
+token_cache = LRUCache(settings.AUTH_TOKEN_CACHE_SIZE,
+                       api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+
+USER_FIELDS = tuple(field.attname for field in User._meta.concrete_fields)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication keeping the field values of recently authenticated
+    users in the process, so an authenticated request doesn't query the
+    user. Every request gets its own instance built from the values.
+    Tokens with current role claims give a ClaimsUser, which loads the
+    user only when a view needs more than the claims.
+
+    Verified tokens are kept too, under a digest of the raw token until
+    their `exp`, so a reused token is checked and decoded once.
+    """
+
+    def get_validated_token(self, raw_token):
+        key = hashlib.blake2b(raw_token, digest_size=20).digest()
+        cached = token_cache.get(key)
+        if cached is None:
+            cached = super().get_validated_token(raw_token)
+            left = cached['exp'] - time.time()
+            if left > 0:
+                token_cache.set(key, cached, ttl=left)
+        # Every request gets its own copy of the payload.
+        token = copy.copy(cached)
+        token.payload = dict(cached.payload)
+        return token
+
+    def get_user(self, validated_token):
+        if claims.has_current_claims(validated_token):
+            return claims.ClaimsUser(
+                validated_token, lambda: self.load_user(validated_token)
+            )
+        return self.load_user(validated_token)
+
+    def load_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            return User.from_db(*snapshot)
+        generation = user_cache.generation
+        user = super().get_user(validated_token)
+        values = tuple(getattr(user, name) for name in USER_FIELDS)
+        user_cache.set(user_id, (user._state.db, USER_FIELDS, values),
+                       generation=generation)
+        return user
+
+
+def _user_changed(sender, instance, **kwargs):
+    # Again after the commit: a request may cache the old row meanwhile.
+    user_cache.delete(instance.pk)
+    transaction.on_commit(lambda: user_cache.delete(instance.pk))
+
+
+def _user_saving(sender, instance, raw=False, update_fields=None,
+                 **kwargs):
+    """Remembers the stored values the claims of tokens are made of."""
+    instance._stored_claims = None
+    if raw or instance.pk is None or (
+        update_fields is not None
+        and not set(update_fields) & set(claims.CLAIM_FIELDS)
+    ):
+        return
+    instance._stored_claims = User.objects.filter(
+        pk=instance.pk
+    ).values_list(*claims.CLAIM_FIELDS).first()
+
+
+def _user_saved(sender, instance, raw=False, **kwargs):
+    stored = getattr(instance, '_stored_claims', None)
+    if raw or stored is None:
+        return
+    if stored != tuple(getattr(instance, name)
+                       for name in claims.CLAIM_FIELDS):
+        claims.bump_role_version(instance.pk)
+
+
+def _user_deleted(sender, instance, **kwargs):
+    claims.bump_role_version(instance.pk)
+
+
+def connect_signals():
+    """
+    Drops cached users on every write to their rows, and the claims of
+    issued tokens on changes of the role, the flags or on deletion.
+    """
+    post_save.connect(_user_changed, sender=User,
+                      dispatch_uid='auth_user_cache')
+    post_delete.connect(_user_changed, sender=User,
+                        dispatch_uid='auth_user_cache')
+    pre_save.connect(_user_saving, sender=User,
+                     dispatch_uid='auth_user_claims')
+    post_save.connect(_user_saved, sender=User,
+                      dispatch_uid='auth_user_claims')
+    post_delete.connect(_user_deleted, sender=User,
+                        dispatch_uid='auth_user_claims')
@@ -0,0 +1,97 @@
+import time
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework_simplejwt.settings import api_settings
+
+from api.cache import bump_after_commit, get_version
+
+ROLE_VERSION_RESOURCE = 'role:{user_id}'
+ROLE_CLAIM = 'role'
+SUPERUSER_CLAIM = 'is_superuser'
+USERNAME_CLAIM = 'username'
+ROLE_VERSION_CLAIM = 'role_version'
+# User fields whose change drops the claims of the issued tokens.
+CLAIM_FIELDS = ('role', 'is_superuser', 'is_active')
+
+
+def get_role_version(user_id):
+    return get_version(ROLE_VERSION_RESOURCE.format(user_id=user_id))
+
+
+def bump_role_version(user_id):
+    """
+    Stops trusting the claims of the tokens issued to the user so far once
+    the write is committed. The tokens themselves stay valid, requests
+    with them load the user instead. Called by the User signals.
+    """
+    bump_after_commit(ROLE_VERSION_RESOURCE.format(user_id=user_id))
+
+
+def add_claims(token, user):
+    """Stores what the permission classes read about the user."""
+    token[ROLE_CLAIM] = user.role
+    token[SUPERUSER_CLAIM] = user.is_superuser
+    token[USERNAME_CLAIM] = user.username
+    token[ROLE_VERSION_CLAIM] = get_role_version(user.pk)
+    return token
+
+
+def has_current_claims(token):
+    """
+    Whether the claims can stand in for the user. The role version lives
+    in the cache of the process unless a shared cache is configured, so
+    without one the claims are trusted only for AUTH_CLAIMS_MAX_AGE
+    seconds after the token was issued, the staleness the user cache
+    accepts as well.
+    """
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    version = token.get(ROLE_VERSION_CLAIM)
+    max_age = settings.AUTH_CLAIMS_MAX_AGE
+    issued_at = token.get('iat', 0)
+    if max_age is not None and issued_at + max_age < time.time():
+        return False
+    return (
+        user_id is not None and version is not None
+        and version == get_role_version(user_id)
+    )
+
+
+def _claim(name):
+    def get(self):
+        if self._wrapped is empty:
+            return self._claims[name]
+        return getattr(self._wrapped, name)
+    return property(get)
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    The user described by a verified token. The id, the username, the role
+    and the superuser flag are read from the claims until the user is
+    loaded with `load`, which happens on the first access to anything else.
+    """
+
+    def __init__(self, token, load):
+        super().__init__(load)
+        user_id = token[api_settings.USER_ID_CLAIM]
+        # Past LazyObject.__setattr__, which would load the user.
+        self.__dict__['_claims'] = {
+            'id': user_id,
+            'pk': user_id,
+            'username': token[USERNAME_CLAIM],
+            'role': token[ROLE_CLAIM],
+            'is_superuser': token[SUPERUSER_CLAIM],
+            'is_active': True,
+            'is_authenticated': True,
+            'is_anonymous': False,
+        }
+
+    id = _claim('id')
+    pk = _claim('pk')
+    username = _claim('username')
+    role = _claim('role')
+    is_superuser = _claim('is_superuser')
+    is_active = _claim('is_active')
+    is_authenticated = _claim('is_authenticated')
+    is_anonymous = _claim('is_anonymous')
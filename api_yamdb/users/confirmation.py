@@ -0,0 +1,62 @@
+import time
+
+from django.conf import settings
+from django.db.models import F
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import User
+
+KEY_SALT = 'users.confirmation'
+# Fields changed by issue_code, to be passed to save(update_fields=...).
+FIELDS = ('confirmation_code', 'confirmation_attempts')
+
+
+def _digest(user, code):
+    return salted_hmac(KEY_SALT, f'{user.pk}:{code}').hexdigest()
+
+
+def _parse(value):
+    """Splits the stored `expires:digest` record."""
+    try:
+        expires, digest = value.split(':')
+        return int(expires), digest
+    except (AttributeError, ValueError):
+        return 0, ''
+
+
+def issue_code(user, code):
+    """
+    Stores a keyed hash of the code and its expiry time in the user row
+    and resets the attempt counter. A single HMAC replaces a password hash
+    here: the bounded number of attempts is what keeps a short code from
+    being guessed.
+    """
+    expires = int(time.time()) + settings.CONFIRMATION_CODE_TTL
+    user.confirmation_code = f'{expires}:{_digest(user, code)}'
+    user.confirmation_attempts = 0
+
+
+def is_pending(user):
+    """Whether the user has a code that has not expired yet."""
+    expires, _ = _parse(user.confirmation_code)
+    return expires > time.time()
+
+
+def check_code(user, code):
+    """
+    Counts the attempt and checks the code against the stored hash. The
+    counter is kept in the user row and taken with a conditional UPDATE,
+    so the limit holds across processes and restarts.
+    """
+    expires, digest = _parse(user.confirmation_code)
+    if expires <= time.time():
+        return False
+    counted = User.objects.filter(
+        pk=user.pk,
+        confirmation_code=user.confirmation_code,
+        confirmation_attempts__lt=settings.CONFIRMATION_CODE_ATTEMPTS,
+    ).update(confirmation_attempts=F('confirmation_attempts') + 1)
+    if not counted:
+        return False
+    user.confirmation_attempts += 1
+    return constant_time_compare(digest, _digest(user, code))
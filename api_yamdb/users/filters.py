@@ -0,0 +1,23 @@
+from django.db.models import Q
+from django_filters import rest_framework as filters
+
+from .models import User
+
+
+class UsersFilter(filters.FilterSet):
+    """Prefix search by username or email and filtering by role."""
+
+    search = filters.CharFilter(method='filter_search')
+    role = filters.ChoiceFilter(
+        choices=[(role, role) for role in User.ALLOWED_ROLES]
+    )
+
+    def filter_search(self, queryset, name, value):
+        """Prefix lookups can seek the case-insensitive indexes."""
+        return queryset.filter(
+            Q(username__istartswith=value) | Q(email__istartswith=value)
+        )
+
+    class Meta:
+        model = User
+        fields = ['role']
@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from users.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE,
+            help='Количество писем, отправляемых за одно соединение.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Проверяет очередь постоянно, а не один раз.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent = 0
+            while True:
+                count = deliver_pending(options['batch_size'])
+                if not count:
+                    break
+                sent += count
+            if sent:
+                self.stdout.write(f'Обработано писем: {sent}.')
+            if not options['loop']:
+                return
+            time.sleep(settings.OUTBOX_POLL_INTERVAL)
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+from users.prefix_indexes import create_prefix_indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_search_indexes'),
+    ]
+
+    operations = [
+        # SQLite drops the prefix indexes when it rebuilds the table.
+        migrations.RunPython(migrations.RunPython.noop,
+                             create_prefix_indexes),
+        migrations.AddField(
+            model_name='user',
+            name='confirmation_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(create_prefix_indexes,
+                             migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@ import secrets
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from .validations import validate_username
 
@@ -50,6 +51,8 @@ class User(AbstractUser):
     is_email_verified = models.BooleanField(default=False)
 
     confirmation_code = models.CharField(blank=True, null=True, max_length=128)
+    # Attempts to enter the current code, see users.confirmation.
+    confirmation_attempts = models.PositiveSmallIntegerField(default=0)
 
     bio = models.TextField(
         'Биография',
@@ -58,3 +61,29 @@ class User(AbstractUser):
 
     def __str__(self):
         return f'{self.username}: AbstracUser instance.'
+
+    class Meta(AbstractUser.Meta):
+        # The admin list filtered by role is paginated by username.
+        indexes = [
+            models.Index(fields=['role', 'username'],
+                         name='users_role_username_idx'),
+        ]
+
+
+class OutboxMessage(models.Model):
+    """Email waiting in the outbox for the background delivery."""
+    subject = models.CharField(max_length=256)
+    body = models.TextField()
+    to = models.EmailField()
+    created = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(default=timezone.now, db_index=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    claimed_by = models.CharField(max_length=32, blank=True)
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
+
+    class Meta:
+        ordering = ('send_after', 'id')
@@ -0,0 +1,158 @@
+import logging
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import mail
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+
+def enqueue(subject, body, to):
+    """
+    Stores the message in the outbox. Delivery starts once the current
+    transaction commits, so a rolled back signup sends nothing.
+    """
+    message = OutboxMessage.objects.create(subject=subject, body=body, to=to)
+    transaction.on_commit(notify)
+    return message
+
+
+def retry_delay(attempts):
+    """Exponential backoff after a failed attempt."""
+    return timedelta(seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def _failed(message, error, now):
+    message.attempts += 1
+    message.send_after = now + retry_delay(message.attempts)
+    message.last_error = f'{type(error).__name__}: {error}'
+    if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        # Given up: the body carries a confirmation code.
+        message.body = ''
+
+
+def _sent(message, now):
+    message.sent_at = now
+    # The body carries a confirmation code, it isn't kept after sending.
+    message.body = ''
+
+
+def claim(batch_size, now):
+    """
+    Takes a batch of due messages for the caller. The conditional UPDATE
+    claims only rows no other worker has claimed in the meantime, and
+    moves them out of the due ones for OUTBOX_LEASE seconds. Works on
+    SQLite too, which has no SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    due = OutboxMessage.objects.filter(
+        sent_at=None, send_after__lte=now,
+        attempts__lt=settings.OUTBOX_MAX_ATTEMPTS
+    )
+    ids = list(due.values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    due.filter(id__in=ids).update(
+        claimed_by=token,
+        send_after=now + timedelta(seconds=settings.OUTBOX_LEASE)
+    )
+    return list(OutboxMessage.objects.filter(claimed_by=token))
+
+
+def deliver_pending(batch_size=None):
+    """
+    Sends a batch of due messages over a single backend connection and
+    returns the number of messages handled. Failed messages are retried
+    later until OUTBOX_MAX_ATTEMPTS is reached; any error of a message is
+    recorded on it, so one bad message can't block the queue. The batch
+    is claimed and committed before sending, so concurrent workers skip
+    it and no transaction stays open while the backend talks to the mail
+    server.
+    """
+    now = timezone.now()
+    messages = claim(batch_size or settings.OUTBOX_BATCH_SIZE, now)
+    if not messages:
+        return 0
+    backend = mail.get_connection()
+    try:
+        backend.open()
+    except Exception as error:
+        for message in messages:
+            _failed(message, error, now)
+    else:
+        try:
+            for message in messages:
+                try:
+                    mail.EmailMessage(
+                        subject=message.subject, body=message.body,
+                        to=[message.to], connection=backend
+                    ).send()
+                except Exception as error:
+                    _failed(message, error, now)
+                else:
+                    _sent(message, now)
+        finally:
+            backend.close()
+    for message in messages:
+        message.claimed_by = ''
+    OutboxMessage.objects.bulk_update(
+        messages,
+        ['sent_at', 'attempts', 'send_after', 'last_error', 'body',
+         'claimed_by']
+    )
+    return len(messages)
+
+
+def drain():
+    """Delivers everything that is due now."""
+    while deliver_pending():
+        pass
+
+
+class OutboxWorker:
+    """Daemon thread of the process draining the outbox."""
+
+    def __init__(self):
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def notify(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='outbox', daemon=True
+                )
+                self.thread.start()
+        self.wakeup.set()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(settings.OUTBOX_POLL_INTERVAL)
+            self.wakeup.clear()
+            try:
+                drain()
+            except Exception:
+                # The thread outlives the error, the next wakeup retries.
+                logging.exception('Ошибка отправки писем из очереди.')
+            finally:
+                connection.close()
+
+
+worker = OutboxWorker()
+
+
+def notify():
+    """Starts the delivery configured by OUTBOX_DELIVERY."""
+    if settings.OUTBOX_DELIVERY == 'thread':
+        worker.notify()
+    elif settings.OUTBOX_DELIVERY == 'sync':
+        # The messages stay queued, the request that enqueued them is done.
+        try:
+            drain()
+        except DatabaseError:
+            logging.exception('Ошибка отправки писем из очереди.')
@@ -0,0 +1,40 @@
+"""
+Case-insensitive indexes for the prefix search of the users list. Django
+2.2 can't declare expression indexes, so they are created per backend in
+the form the `istartswith` lookup of that backend can seek with.
+
+SQLite rebuilds a table to alter it and keeps only the indexes Django
+knows about, so a migration changing `users_user` has to create these
+again, in both directions.
+"""
+CREATE_INDEX = {
+    'sqlite': (
+        'CREATE INDEX IF NOT EXISTS "users_user_{field}_nocase" '
+        'ON "users_user" ("{field}" COLLATE NOCASE)'
+    ),
+    'postgresql': (
+        'CREATE INDEX IF NOT EXISTS "users_user_{field}_upper" '
+        'ON "users_user" (UPPER("{field}"::text) text_pattern_ops)'
+    ),
+}
+DROP_INDEX = {
+    'sqlite': 'DROP INDEX IF EXISTS "users_user_{field}_nocase"',
+    'postgresql': 'DROP INDEX IF EXISTS "users_user_{field}_upper"',
+}
+PREFIX_FIELDS = ('username', 'email')
+
+
+def _run(statements, schema_editor):
+    sql = statements.get(schema_editor.connection.vendor)
+    if sql is None:
+        return
+    for field in PREFIX_FIELDS:
+        schema_editor.execute(sql.format(field=field))
+
+
+def create_prefix_indexes(apps, schema_editor):
+    _run(CREATE_INDEX, schema_editor)
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    _run(DROP_INDEX, schema_editor)
@@ -1,8 +1,8 @@
-from django.contrib.auth.hashers import check_password
 from django.contrib.auth.validators import UnicodeUsernameValidator
 
 from rest_framework import serializers
 
+from . import confirmation
 from .validations import Custom404Validation
 from .models import User
 
@@ -77,13 +77,11 @@ class TokenSerializer(serializers.Serializer):
 
         user = User.objects.get(username=data['username'])
 
-        if not check_password(
-            data['confirmation_code'],
-            user.confirmation_code
-        ):
+        if not confirmation.check_code(user, data['confirmation_code']):
             invalid_code = (
                 'Please make sure that you have entered the correct '
-                'confirmation code.'
+                'confirmation code. Codes expire and allow a limited number '
+                'of attempts, request a new one if needed.'
             )
             raise serializers.ValidationError(
                 {'confirmation_code': invalid_code}
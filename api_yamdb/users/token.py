@@ -1,5 +1,7 @@
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .claims import add_claims
+
 
 def get_tokens_for_user(user):
     """
@@ -9,6 +11,8 @@ def get_tokens_for_user(user):
     refresh = RefreshToken.for_user(user)
     # Required scopes: according to ReDoc
     refresh['write'] = user.role
+    # Permission classes evaluate these without loading the user.
+    add_claims(refresh, user)
 
     return {
         'Token': str(refresh.access_token)
@@ -1,5 +1,3 @@
-from django.core.mail import EmailMessage
-from django.contrib.auth.hashers import make_password
 from django.contrib.sites.shortcuts import get_current_site
 
 from rest_framework import permissions, status, viewsets
@@ -7,6 +5,9 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import action
 
+from api.mixins import RelatedQuerysetMixin
+from . import confirmation, outbox
+from .filters import UsersFilter
 from .serializers import (
     TokenSerializer,
     UserSerializer,
@@ -27,16 +28,15 @@ class SignUpViewSet(APIView):
     def send_email_action(self, user, request):
         """
         Sending an email after receiving a POST request for registration.
-        The self argument contains the user object.
+        The self argument contains the user object. The email is queued
+        in the outbox and delivered in the background.
         """
         current_site = get_current_site(request)
         email_subject = 'Activate your account.'
 
         confirmation_code = User.define_confirmation_code()
-        hashed_confirmation_code = make_password(confirmation_code)
-
-        user.confirmation_code = hashed_confirmation_code
-        user.save()
+        confirmation.issue_code(user, confirmation_code)
+        user.save(update_fields=confirmation.FIELDS)
 
         email_body = (
             f'Hi, {user.username}. Send to `{current_site}` your username and '
@@ -44,20 +44,18 @@ class SignUpViewSet(APIView):
             f'{confirmation_code}'
         )
 
-        email = EmailMessage(subject=email_subject, body=email_body,
-                             to=[user.email])
-        email.send()
+        outbox.enqueue(email_subject, email_body, user.email)
 
     def post(self, request):
         """
         A pre check is enabled to see if this user has already beencreated
-        before.
+        before. Such a user gets a new code once the previous one expires.
         """
         if User.objects.filter(username=request.data.get('username')).exists():
             user = User.objects.get(
                 username=request.data.get('username')
             )
-            if user.confirmation_code is None:
+            if not confirmation.is_pending(user):
                 self.send_email_action(user, request)
                 return Response(
                     request.data,
@@ -102,17 +100,21 @@ class CustomTokenView(APIView):
         )
 
 
-class UsersView(viewsets.ModelViewSet):
+class UsersView(RelatedQuerysetMixin, viewsets.ModelViewSet):
     """
     RoleBasedPermission is used.
     Requires an additional `allowed_roles` argument
     in the form of a list or tuple containing allowed user roles.
+    The list is searched by username or email prefix with `?search=`,
+    filtered with `?role=` and paginated by username with cursors.
     """
-    queryset = User.objects.all()
+    queryset = User.objects.order_by('username')
     serializer_class = UserAllFieldSerializer
     permission_classes = [RoleBasedPermission]
     allowed_roles = ('admin',)
     lookup_field = 'username'
+    filterset_class = UsersFilter
+    keyset_ordering = ('username',)
 
     @action(
         methods=["get", "patch"],
@@ -0,0 +1,70 @@
+"""
+CPU time of JWT authentication per request on the review and comment
+endpoints, with and without the verified-token cache. The token carries
+role claims, so neither variant queries the database.
+
+    python benchmarks/bench_auth.py [--rounds 5000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from rest_framework_simplejwt.authentication import (  # noqa: E402
+    JWTAuthentication
+)
+
+from users.authentication import CachedJWTAuthentication  # noqa: E402
+from users.models import User  # noqa: E402
+from users.token import get_tokens_for_user  # noqa: E402
+
+PATHS = (
+    ('reviews', '/api/v1/titles/1/reviews/'),
+    ('comments', '/api/v1/titles/1/reviews/1/comments/'),
+)
+
+
+class VerifyingAuthentication(CachedJWTAuthentication):
+    """The same authentication verifying the token on every request."""
+    get_validated_token = JWTAuthentication.get_validated_token
+
+
+def measure(authentication, request, rounds):
+    assert authentication.authenticate(request) is not None
+    return min(timeit.repeat(
+        lambda: authentication.authenticate(request), number=rounds,
+        repeat=3
+    )) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=5000)
+    args = parser.parse_args()
+    user = User(id=1, username='reader', role='user')
+    token = get_tokens_for_user(user)['Token']
+    factory = APIRequestFactory()
+    for name, path in PATHS:
+        request = Request(
+            factory.get(path, HTTP_AUTHORIZATION=f'Bearer {token}')
+        )
+        verifying = measure(VerifyingAuthentication(), request, args.rounds)
+        cached = measure(CachedJWTAuthentication(), request, args.rounds)
+        print(f'{name:8} verified {verifying * 1e6:8.1f} us/request '
+              f'cached {cached * 1e6:8.1f} us/request '
+              f'saved {(verifying - cached) * 1e6:8.1f} us')
+
+
+if __name__ == '__main__':
+    main()
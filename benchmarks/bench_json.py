@@ -0,0 +1,92 @@
+"""
+Throughput of the JSON renderers on large title and review pages.
+
+    python benchmarks/bench_json.py [--items 1000] [--rounds 50]
+"""
+import argparse
+import datetime
+import os
+import sys
+import timeit
+from collections import OrderedDict
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.utils.serializer_helpers import ReturnList  # noqa: E402
+
+from api.renderers import FastJSONRenderer, orjson  # noqa: E402
+
+
+def titles_page(items):
+    return OrderedDict((
+        ('count', items), ('next', None), ('previous', None),
+        ('results', ReturnList([
+            OrderedDict((
+                ('id', number),
+                ('name', f'Побег из Шоушенка {number}'),
+                ('year', 1994),
+                ('rating', number % 10 + 1),
+                ('description', 'Описание произведения ' * 10),
+                ('genre', [
+                    OrderedDict((('name', 'Драма'), ('slug', 'drama'))),
+                    OrderedDict((('name', 'Детектив'), ('slug', 'detective'))),
+                ]),
+                ('category', OrderedDict((('name', 'Фильм'),
+                                          ('slug', 'movie')))),
+            )) for number in range(items)
+        ], serializer=None)),
+    ))
+
+
+def reviews_page(items):
+    now = timezone.now()
+    return OrderedDict((
+        ('count', items), ('next', None), ('previous', None),
+        ('results', ReturnList([
+            OrderedDict((
+                ('id', number),
+                ('text', 'Текст отзыва, достаточно длинный. ' * 20),
+                ('author', f'user{number}'),
+                ('score', number % 10 + 1),
+                ('pub_date', now - datetime.timedelta(minutes=number)),
+            )) for number in range(items)
+        ], serializer=None)),
+    ))
+
+
+def measure(renderer, data, rounds):
+    size = len(renderer.render(data))
+    seconds = min(timeit.repeat(
+        lambda: renderer.render(data), number=rounds, repeat=3
+    )) / rounds
+    return size, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+    if orjson is None:
+        print('orjson is not installed, FastJSONRenderer uses the stdlib.')
+    renderers = (('JSONRenderer', JSONRenderer()),
+                 ('FastJSONRenderer', FastJSONRenderer()))
+    for page_name, page in (('titles', titles_page(args.items)),
+                            ('reviews', reviews_page(args.items))):
+        for name, renderer in renderers:
+            size, seconds = measure(renderer, page, args.rounds)
+            print(f'{page_name:8} {name:17} {size / seconds / 2 ** 20:9.1f}'
+                  f' MiB/s {seconds * 1000:8.2f} ms/page')
+
+
+if __name__ == '__main__':
+    main()
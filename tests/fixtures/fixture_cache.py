@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # The test database is flushed between tests, the caches are not.
+    from django.core.cache import cache
+
+    from users.authentication import token_cache, user_cache
+
+    cache.clear()
+    user_cache.clear()
+    token_cache.clear()
+    yield
+    cache.clear()
+    user_cache.clear()
+    token_cache.clear()
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def sync_outbox(settings):
+    # Tests read mail.outbox right after the request.
+    settings.OUTBOX_DELIVERY = 'sync'
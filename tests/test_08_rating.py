@@ -0,0 +1,100 @@
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+class Test08TitleRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_is_maintained(self, admin_client, admin):
+        from reviews.models import Title
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.score_count, title.rating) == (12, 3, 4), (
+            'Проверьте, что при создании отзыва обновляются сумма и количество '
+            'оценок произведения и его `rating`'
+        )
+
+        client_user = auth_client(user)
+        client_user.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'score': 9}
+        )
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (18, 3, 6), (
+            'Проверьте, что при изменении оценки отзыва пересчитывается `rating`'
+        )
+
+        for review in reviews:
+            response = admin_client.delete(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+            )
+            assert response.status_code == 204
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (0, 0, None), (
+            'Проверьте, что после удаления всех отзывов `rating` равен `None`'
+        )
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rating_follows_cascades_and_orm(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.score_count, title.rating) == (9, 2, 4), (
+            'Проверьте, что `rating` пересчитывается, когда отзывы удаляются '
+            'вместе с автором'
+        )
+        review = Review.objects.get(pk=reviews[0]['id'])
+        review.score, review.title_id = 10, titles[1]['id']
+        review.save()
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (4, 1, 4)
+        other = Title.objects.get(pk=titles[1]['id'])
+        assert (other.score_sum, other.score_count, other.rating) == (10, 1, 10)
+        response = admin_client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.json()['rating'] == 10
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_cascades_update_titles_once(self, admin_client, admin):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Title
+
+        def title_updates(context):
+            return [query['sql'] for query in context.captured_queries
+                    if query['sql'].startswith('UPDATE "reviews_title"')]
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        auth_client(user).post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'Ещё отзыв', 'score': 7}
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        assert len(title_updates(context)) == 2, (
+            'Проверьте, что при удалении пользователя оценки каждого '
+            'произведения пересчитываются одним запросом'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.score_count, title.rating) == (9, 2, 4)
+        other = Title.objects.get(pk=titles[1]['id'])
+        assert (other.score_sum, other.score_count, other.rating) == (
+            0, 0, None
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(
+                f'/api/v1/titles/{titles[0]["id"]}/'
+            )
+        assert response.status_code == 204
+        assert not title_updates(context), (
+            'Проверьте, что при удалении произведения его оценки '
+            'не пересчитываются для каждого отзыва'
+        )
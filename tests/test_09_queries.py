@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments, create_titles
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+class Test09QueryCount:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_list_constant_queries(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        few = count_queries(client, '/api/v1/titles/')
+        for number in range(3):
+            admin_client.post('/api/v1/titles/', data={
+                'name': f'Произведение {number}', 'year': 2001,
+                'genre': [genre['slug'] for genre in genres],
+                'category': categories[0]['slug']
+            })
+        many = count_queries(client, '/api/v1/titles/')
+        assert few == many, (
+            'Проверьте, что количество запросов к БД при GET запросе '
+            '`/api/v1/titles/` не зависит от размера страницы'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_and_comments_constant_queries(self, client,
+                                                      admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review_id}/comments/'
+        assert count_queries(client, reviews_url) <= 3, (
+            'Проверьте, что авторы и произведения отзывов загружаются '
+            'вместе со страницей'
+        )
+        assert count_queries(client, comments_url) <= 4, (
+            'Проверьте, что авторы и отзывы комментариев загружаются '
+            'вместе со страницей'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_review_create_queries(self, admin_client, user_client):
+        titles, categories, genres = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Отзыв', 'score': 7}
+        # The authenticated user is cached after the first request.
+        user_client.get('/api/v1/users/me/')
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data=data)
+        assert response.status_code == 201
+        assert response.json()['title'] == titles[0]['name']
+        writes = [query['sql'] for query in context.captured_queries
+                  if not query['sql'].startswith('SELECT')]
+        assert len(context.captured_queries) - len(writes) == 1, (
+            'Проверьте, что произведение и наличие отзыва автора '
+            'проверяются одним запросом'
+        )
+        assert len(context.captured_queries) <= 4, (
+            'Проверьте, что создание отзыва укладывается в чтение, '
+            'вставку и пересчёт рейтинга в одной транзакции'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data=data)
+        assert response.status_code == 400
+        assert len(context.captured_queries) == 1
+        response = user_client.post('/api/v1/titles/999/reviews/', data=data)
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_comments_route_queries(self, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        review = reviews[0]
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(f'{url}comments/',
+                                         data={'text': 'Комментарий'})
+        assert response.status_code == 201
+        assert response.json()['review'] == review['text']
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что при создании комментария отзыв загружается '
+            'одним запросом'
+        )
+        assert count_queries(admin_client, f'{url}comments/') <= 3
+        other = f'/api/v1/titles/{titles[1]["id"]}/reviews/{review["id"]}/'
+        assert admin_client.get(f'{other}comments/').status_code == 404, (
+            'Проверьте, что комментарии отзыва недоступны по адресу '
+            'другого произведения'
+        )
+        response = admin_client.post(f'{other}comments/',
+                                     data={'text': 'Комментарий'})
+        assert response.status_code == 404
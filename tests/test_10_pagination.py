@@ -0,0 +1,88 @@
+import base64
+import json
+
+import pytest
+
+from .common import create_reviews, create_titles
+
+
+def encode(position):
+    return base64.urlsafe_b64encode(
+        json.dumps({'p': position}).encode()
+    ).decode().rstrip('=')
+
+
+class Test10KeysetPagination:
+
+    def walk(self, client, url):
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что при курсорной пагинации не возвращается `count`'
+            )
+            pages.append(data)
+            url = data['next']
+        return pages
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        for number in range(6):
+            admin_client.post('/api/v1/titles/', data={
+                'name': 'Дубль', 'year': 2000 + number,
+                'genre': [genres[0]['slug']],
+                'category': categories[0]['slug']
+            })
+        expected = [
+            title['id'] for title in sorted(
+                client.get('/api/v1/titles/').json()['results']
+                + client.get('/api/v1/titles/?page=2').json()['results'],
+                key=lambda title: (title['name'], title['id'])
+            )
+        ]
+        pages = self.walk(client, '/api/v1/titles/?pagination=cursor')
+        assert len(pages) == 2
+        assert pages[0]['previous'] is None
+        received = [
+            title['id'] for page in pages for title in page['results']
+        ]
+        assert received == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` обходит '
+            'все произведения в порядке `name`, `id` без пропусков и повторов'
+        )
+        previous = client.get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[0]['results'], (
+            'Проверьте, что ссылка `previous` возвращает предыдущую страницу'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_cursor_and_invalid(self, client, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        pages = self.walk(client, f'{url}?pagination=cursor')
+        received = [
+            review['id'] for page in pages for review in page['results']
+        ]
+        assert received == [review['id'] for review in reviews]
+        response = client.get(f'{url}?cursor=broken')
+        assert response.status_code == 404, (
+            'Проверьте, что при неверном курсоре возвращается статус 404'
+        )
+        for path, position in (
+            ('/api/v1/titles/', ['a', 'x']),
+            (url, ['notadate', 1]),
+            (url, [1, 1]),
+        ):
+            response = client.get(f'{path}?cursor={encode(position)}')
+            assert response.status_code == 404, (
+                'Проверьте, что при курсоре со значениями неверного типа '
+                'возвращается статус 404'
+            )
+        data = client.get(url).json()
+        assert 'count' in data, (
+            'Проверьте, что без `pagination=cursor` используется '
+            'постраничная пагинация'
+        )
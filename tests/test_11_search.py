@@ -0,0 +1,39 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test11TitleSearch:
+
+    def search(self, client, query):
+        response = client.get('/api/v1/titles/', {'search': query})
+        assert response.status_code == 200
+        return [title['id'] for title in response.json()['results']]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        assert self.search(client, 'поворот') == [titles[0]['id']], (
+            'Проверьте, что поиск `search` по `/api/v1/titles/` не зависит '
+            'от регистра кириллических букв'
+        )
+        assert self.search(client, 'драма') == [titles[1]['id']], (
+            'Проверьте, что поиск `search` ищет по описанию произведения'
+        )
+        assert self.search(client, 'пов туд') == [titles[0]['id']], (
+            'Проверьте, что поиск `search` поддерживает поиск по началу слов'
+        )
+        assert self.search(client, 'вымысел') == []
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/', data={'name': 'Вымысел'}
+        )
+        assert self.search(client, 'вымысел') == [titles[1]['id']], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert self.search(client, 'вымысел') == [], (
+            'Проверьте, что поисковый индекс обновляется при удалении '
+            'произведения'
+        )
@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_reviews, create_titles
+
+
+class Test12CatalogCache:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return response.json(), len(context.captured_queries)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cached_and_invalidated(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        first, _ = self.get(client, '/api/v1/titles/')
+        second, queries = self.get(client, '/api/v1/titles/')
+        assert second == first and queries == 0, (
+            'Проверьте, что повторный GET запрос `/api/v1/titles/` '
+            'отдаётся из кэша без запросов к БД'
+        )
+        admin_client.post('/api/v1/genres/', data={'name': 'Ж', 'slug': 'g'})
+        _, queries = self.get(client, '/api/v1/titles/')
+        assert queries > 0, (
+            'Проверьте, что запись в `Genre` сбрасывает кэш произведений'
+        )
+        filtered, _ = self.get(client, '/api/v1/titles/?year=2000')
+        cached, queries = self.get(client, '/api/v1/titles/?year=2000')
+        assert cached == filtered and queries == 0
+        assert cached != second, (
+            'Проверьте, что ключ кэша учитывает параметры запроса'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rating_change_invalidates(self, client, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        data, _ = self.get(client, url)
+        assert data['rating'] == 4
+        auth_client(user).patch(
+            f'{url}reviews/{reviews[1]["id"]}/', data={'score': 9}
+        )
+        data, _ = self.get(client, url)
+        assert data['rating'] == 6, (
+            'Проверьте, что изменение оценки отзыва сбрасывает кэш '
+            'произведений'
+        )
+        self.get(client, '/api/v1/categories/')
+        auth_client(user).patch(
+            f'{url}reviews/{reviews[1]["id"]}/', data={'score': 1}
+        )
+        _, queries = self.get(client, '/api/v1/categories/')
+        assert queries == 0, (
+            'Проверьте, что запись в отзывы не сбрасывает кэш категорий'
+        )
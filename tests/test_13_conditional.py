@@ -0,0 +1,128 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_comments
+
+
+class Test13ConditionalGet:
+
+    def revalidate(self, client, url, etag):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        return response, len(context.captured_queries)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_not_modified(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        for url in (title_url, reviews_url, comments_url,
+                    '/api/v1/genres/', '/api/v1/categories/'):
+            response = client.get(url)
+            etag = response.get('ETag')
+            assert response.status_code == 200 and etag, (
+                f'Проверьте, что GET запрос `{url}` возвращает заголовок `ETag`'
+            )
+            assert response.get('Last-Modified'), (
+                f'Проверьте, что GET запрос `{url}` возвращает заголовок '
+                '`Last-Modified`'
+            )
+            response, queries = self.revalidate(client, url, etag)
+            assert response.status_code == 304 and queries == 0, (
+                f'Проверьте, что GET запрос `{url}` с актуальным '
+                '`If-None-Match` возвращает статус 304 без запросов к БД'
+            )
+            assert not response.content
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_modified(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        reviews_etag = client.get(reviews_url)['ETag']
+        comments_etag = client.get(comments_url)['ETag']
+        other_etag = client.get(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        )['ETag']
+
+        auth_client(user).patch(
+            f'{reviews_url}{reviews[1]["id"]}/', data={'text': 'Изменено'}
+        )
+        response, _ = self.revalidate(client, reviews_url, reviews_etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение отзыва меняет `ETag` списка отзывов'
+        )
+        response, _ = self.revalidate(client, comments_url, comments_etag)
+        assert response.status_code == 304, (
+            'Проверьте, что изменение другого отзыва не меняет `ETag` '
+            'комментариев'
+        )
+        response, _ = self.revalidate(
+            client, f'/api/v1/titles/{titles[1]["id"]}/reviews/', other_etag
+        )
+        assert response.status_code == 304
+
+        auth_client(user).post(comments_url, data={'text': 'Новый'})
+        response, _ = self.revalidate(client, comments_url, comments_etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый комментарий меняет `ETag` комментариев'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_author_renamed(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        etags = {url: client.get(url)['ETag']
+                 for url in (reviews_url, comments_url)}
+        response = admin_client.patch(f'/api/v1/users/{user.username}/',
+                                      data={'username': 'Renamed'})
+        assert response.status_code == 200
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                f'Проверьте, что после смены username автора GET запрос '
+                f'`{url}` со старым `If-None-Match` возвращает новые данные'
+            )
+            assert 'Renamed' in response.content.decode()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_other_process_write(self, client, admin_client, admin,
+                                    settings):
+        from django.core.cache import cache
+
+        from reviews.models import Review
+
+        comments, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        settings.CACHE_VERSION_TIMEOUT = 1
+        cache.clear()
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(reviews_url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        # Queryset updates send no signals, like writes of another process.
+        Review.objects.filter(pk=reviews[0]['id']).update(text='Изменено')
+        time.sleep(1.1)
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что `ETag` устаревает через CACHE_VERSION_TIMEOUT, '
+            'даже если запись сделал другой процесс'
+        )
+        assert 'Изменено' in response.content.decode()
+        response = client.get(reviews_url,
+                              HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 200, (
+            'Проверьте, что `Last-Modified` устаревает через '
+            'CACHE_VERSION_TIMEOUT'
+        )
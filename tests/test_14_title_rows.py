@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from .common import create_reviews
+
+
+class Test14TitleRowSerializer:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_parity_with_model_serializer(self, client, admin_client,
+                                             admin):
+        from api.serializers import ReadOnlyTitleSerializer
+        from reviews.models import Title
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Без жанра', 'year': 1999, 'genre': [],
+            'category': 'books'
+        }, format='json')
+        assert response.status_code == 201
+        admin_client.delete('/api/v1/categories/books/')
+
+        expected = json.loads(json.dumps(ReadOnlyTitleSerializer(
+            Title.objects.order_by('name'), many=True
+        ).data))
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'] == expected, (
+            'Проверьте, что быстрый сериализатор произведений возвращает те же '
+            'данные, что и `ReadOnlyTitleSerializer`'
+        )
+        for title in expected:
+            response = client.get(f'/api/v1/titles/{title["id"]}/')
+            assert response.json() == title
+        assert client.get('/api/v1/titles/999/').status_code == 404
@@ -0,0 +1,89 @@
+import datetime
+import io
+from decimal import Decimal
+
+import pytest
+
+
+def sample_data():
+    from django.utils import timezone
+    from django.utils.translation import gettext_lazy
+    from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+    review = ReturnDict((
+        ('id', 1),
+        ('text', 'Отзыв с разделителем\u2028'),
+        ('pub_date', datetime.datetime(2019, 8, 24, 14, 15, 22, 123456,
+                                       tzinfo=timezone.utc)),
+        ('score', Decimal('7.5')),
+        ('detail', gettext_lazy('Not found.')),
+        (5, None),
+    ), serializer=None)
+    return {'results': ReturnList([review], serializer=None), 'count': 1}
+
+
+class Test15FastJSON:
+
+    def test_01_renderer_matches_stdlib(self):
+        from rest_framework.renderers import JSONRenderer
+
+        from api.renderers import FastJSONRenderer
+
+        data = sample_data()
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data), (
+            'Проверьте, что быстрый рендерер выдаёт тот же JSON, '
+            'что и `JSONRenderer`'
+        )
+        assert FastJSONRenderer().render(None) == b''
+        indented = FastJSONRenderer().render(
+            data, 'application/json; indent=4', {}
+        )
+        assert indented == JSONRenderer().render(
+            data, 'application/json; indent=4', {}
+        )
+
+    def test_02_renderer_without_orjson(self, monkeypatch):
+        from rest_framework.renderers import JSONRenderer
+
+        from api import renderers
+
+        monkeypatch.setattr(renderers, 'orjson', None)
+        data = sample_data()
+        assert renderers.FastJSONRenderer().render(data) == (
+            JSONRenderer().render(data)
+        )
+
+    def test_03_parser(self):
+        from rest_framework.exceptions import ParseError
+
+        from api.parsers import FastJSONParser
+
+        body = '{"text": "Ура", "score": 5}'.encode()
+        assert FastJSONParser().parse(io.BytesIO(body)) == {
+            'text': 'Ура', 'score': 5
+        }
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"score": NaN}'))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_api_json_body(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/genres/', data='{"name": "Рок", "slug": "rock"}',
+            content_type='application/json'
+        )
+        assert response.status_code == 201
+        assert response.json() == {'name': 'Рок', 'slug': 'rock'}
+
+    def test_05_non_finite_floats(self):
+        from rest_framework.renderers import JSONRenderer
+
+        from api.renderers import FastJSONRenderer, orjson
+
+        if orjson is None:
+            pytest.skip('orjson не установлен')
+        data = {'score': float('nan')}
+        with pytest.raises(ValueError):
+            JSONRenderer().render(data)
+        assert FastJSONRenderer().render(data) == b'{"score":null}', (
+            'Описанное в `FastJSONRenderer` отличие: NaN выводится как null'
+        )
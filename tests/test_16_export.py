@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from .common import create_reviews
+
+
+class Test16TitleExport:
+
+    def export(self, client, url='/api/v1/titles/export/'):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.streaming, (
+            'Проверьте, что выгрузка `/api/v1/titles/export/` отдаётся потоком'
+        )
+        body = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export(self, client, user_client, admin_client, admin,
+                       monkeypatch):
+        from api.views import TitlesViewSet
+
+        monkeypatch.setattr(TitlesViewSet, 'export_chunk_size', 1)
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        assert client.get('/api/v1/titles/export/').status_code == 401
+        assert user_client.get('/api/v1/titles/export/').status_code == 403, (
+            'Проверьте, что выгрузка каталога доступна только администратору'
+        )
+        lines = self.export(admin_client)
+        assert [line['id'] for line in lines] == sorted(
+            title['id'] for title in titles
+        )
+        detail = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert lines[0] == detail.json(), (
+            'Проверьте, что строки выгрузки совпадают с данными произведения'
+        )
+        resumed = self.export(
+            admin_client, f'/api/v1/titles/export/?after={lines[0]["id"]}'
+        )
+        assert resumed == lines[1:], (
+            'Проверьте, что выгрузку можно продолжить с параметром `after`'
+        )
+        for after in ('x', '²', '-1'):
+            response = admin_client.get(
+                f'/api/v1/titles/export/?after={after}'
+            )
+            assert response.status_code == 400
@@ -0,0 +1,100 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_categories, create_genre
+
+
+class Test17BulkTitles:
+
+    def items(self, genres, categories, count):
+        return [
+            {'name': f'Произведение {number}', 'year': 2000 + number,
+             'genre': [genre['slug'] for genre in genres[:number % 3 + 1]],
+             'category': categories[number % 2]['slug'],
+             'description': 'Пакетная загрузка'}
+            for number in range(count)
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_create(self, client, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as small:
+            response = admin_client.post(
+                '/api/v1/titles/', self.items(genres, categories, 2),
+                format='json'
+            )
+        assert response.status_code == 201
+        items = self.items(genres, categories, 20)
+        with CaptureQueriesContext(connection) as large:
+            response = admin_client.post('/api/v1/titles/', items,
+                                         format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что POST запрос `/api/v1/titles/` со списком '
+            'произведений возвращает статус 201'
+        )
+        assert len(large.captured_queries) == len(small.captured_queries), (
+            'Проверьте, что пакетное создание произведений выполняет '
+            'постоянное число запросов к БД'
+        )
+        data = response.json()
+        assert [sorted(title['genre']) for title in data] == [
+            sorted(item['genre']) for item in items
+        ]
+        for title in data:
+            detail = client.get(f'/api/v1/titles/{title["id"]}/').json()
+            assert detail['name'] == title['name']
+            assert detail['category']['slug'] == title['category']
+            assert sorted(genre['slug'] for genre in detail['genre']) == (
+                sorted(title['genre'])
+            ), (
+                'Проверьте, что пакетное создание связывает произведения '
+                'с жанрами'
+            )
+        assert client.get('/api/v1/titles/').json()['count'] == 22, (
+            'Проверьте, что пакетное создание сбрасывает кэш списка'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bulk_errors(self, admin_client, user_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        items = self.items(genres, categories, 3)
+        items[1]['genre'] = ['unknown']
+        items[2]['category'] = 'unknown'
+        response = admin_client.post('/api/v1/titles/', items, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {} and 'genre' in errors[1] and (
+            'category' in errors[2]
+        ), (
+            'Проверьте, что при пакетном создании ошибки возвращаются '
+            'для каждого элемента'
+        )
+        assert admin_client.get('/api/v1/titles/').json()['count'] == 0
+        response = admin_client.post('/api/v1/titles/', [], format='json')
+        assert response.status_code == 400
+        response = user_client.post('/api/v1/titles/', items[:1],
+                                    format='json')
+        assert response.status_code == 403
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_bulk_duplicate_genres(self, client, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        items = self.items(genres, categories, 1)
+        items[0]['genre'] = [genres[0]['slug'], genres[0]['slug']]
+        response = admin_client.post('/api/v1/titles/', items, format='json')
+        assert response.status_code == 201
+        assert response.json()[0]['genre'] == [genres[0]['slug']]
+        detail = client.get(
+            f'/api/v1/titles/{response.json()[0]["id"]}/'
+        ).json()
+        assert [genre['slug'] for genre in detail['genre']] == [
+            genres[0]['slug']
+        ], (
+            'Проверьте, что пакетное создание не связывает произведение '
+            'с одним жанром дважды'
+        )
@@ -0,0 +1,284 @@
+import csv
+import os
+import sqlite3
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+
+def csv_rows(name):
+    with open(os.path.join(settings.DIR_FOR_CSV, f'{name}.csv'),
+              encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+class Test18Csv2db:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_load_static_data(self):
+        from reviews.management.commands.csv2db import FILES_CLASSES
+        from reviews.models import Review, Title
+
+        call_command('csv2db', batch_size=7)
+        for name, model in FILES_CLASSES.items():
+            assert model.objects.count() == len(csv_rows(name)), (
+                f'Проверьте, что csv2db загружает все строки `{name}.csv`'
+            )
+        review = csv_rows('review')[0]
+        stored = Review.objects.get(pk=review['id'])
+        assert stored.pub_date.isoformat().startswith(
+            review['pub_date'][:19]
+        ), 'Проверьте, что csv2db сохраняет `pub_date` из файла'
+        assert stored.author_id == int(review['author'])
+
+        scores = [
+            int(row['score']) for row in csv_rows('review')
+            if row['title_id'] == '1'
+        ]
+        title = Title.objects.get(pk=1)
+        assert (title.score_sum, title.score_count) == (
+            sum(scores), len(scores)
+        ), 'Проверьте, что csv2db пересчитывает оценки произведений'
+        assert title.rating == sum(scores) // len(scores)
+        assert not Title.objects.filter(reviews=None).exclude(
+            rating=None
+        ).exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_broken_foreign_key(self, tmp_path, settings):
+        from reviews.models import Categories, Title
+
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n', encoding='utf-8'
+        )
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category_id\n1,Один,1990,1\n2,Два,1991,5\n',
+            encoding='utf-8'
+        )
+        settings.DIR_FOR_CSV = str(tmp_path)
+        call_command('csv2db')
+        assert Categories.objects.count() == 1
+        assert Title.objects.count() == 0, (
+            'Проверьте, что таблица с неверным внешним ключом не загружается '
+            'частично'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_streaming_progress(self, caplog):
+        from reviews.management.commands.csv2db import (
+            get_csv_path, iter_batches, open_csv_file
+        )
+
+        with open_csv_file(get_csv_path('review')) as (header, rows, source):
+            assert not isinstance(rows, list), (
+                'Проверьте, что csv2db читает файл потоком'
+            )
+            first = next(rows)
+            assert '\n' in first['text']
+            assert 0 < source.bytes_read < os.path.getsize(
+                get_csv_path('review')
+            )
+        assert [len(batch) for batch in iter_batches(range(7), 3)] == [3, 3, 1]
+
+        caplog.set_level('INFO')
+        call_command('csv2db', batch_size=10, progress_interval=0)
+        assert any(
+            message.startswith('Review: ') and 'МБ' in message
+            for message in caplog.messages
+        ), 'Проверьте, что csv2db сообщает о прогрессе загрузки'
+
+    def test_04_table_dependencies(self):
+        from reviews.management.commands.csv2db import (
+            FILES_CLASSES, table_dependencies
+        )
+
+        dependencies = table_dependencies(FILES_CLASSES)
+        assert dependencies['category'] == set()
+        assert dependencies['users'] == set()
+        assert dependencies['titles'] == {'category'}
+        assert dependencies['genre_title'] == {'titles', 'genre'}
+        assert dependencies['review'] == {'titles', 'users'}
+        assert dependencies['comments'] == {'review', 'users'}, (
+            'Проверьте, что csv2db строит граф зависимостей по внешним ключам'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_skip_dependent_tables(self, tmp_path, settings):
+        from reviews.management.commands.csv2db import (
+            FILES_CLASSES, load_tables
+        )
+        from reviews.models import Genre, Review
+
+        (tmp_path / 'genre.csv').write_text(
+            'id,name,slug\n1,Драма,drama\n', encoding='utf-8'
+        )
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category_id\n1,Один,1990,5\n', encoding='utf-8'
+        )
+        settings.DIR_FOR_CSV = str(tmp_path)
+        loaded = load_tables(FILES_CLASSES, 3)
+        assert loaded == {'genre'}
+        assert Genre.objects.count() == 1
+        assert not Review.objects.exists(), (
+            'Проверьте, что таблицы с незагруженными зависимостями '
+            'пропускаются'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_01_dependency_cycle(self, tmp_path, settings, monkeypatch):
+        from reviews.management.commands import csv2db
+        from reviews.models import Categories, Genre
+
+        settings.DIR_FOR_CSV = str(tmp_path)
+        monkeypatch.setattr(csv2db, 'table_dependencies', lambda files: {
+            'category': {'genre'}, 'genre': {'category'}
+        })
+        loaded = csv2db.load_tables(
+            {'category': Categories, 'genre': Genre}, 2
+        )
+        assert loaded == set(), (
+            'Проверьте, что таблицы с циклическими зависимостями '
+            'пропускаются, а загрузка завершается'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_02_write_lock_at_start(self):
+        from django.db import connection
+        from reviews.management.commands.csv2db import write_transaction
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('BEGIN IMMEDIATE есть только в SQLite')
+        other = sqlite3.connect(connection.settings_dict['NAME'], timeout=0)
+        try:
+            with write_transaction():
+                with pytest.raises(sqlite3.OperationalError):
+                    other.execute('BEGIN IMMEDIATE')
+            other.execute('BEGIN IMMEDIATE')
+            other.rollback()
+        finally:
+            other.close()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_incremental(self, tmp_path, settings, caplog):
+        from reviews.models import Genre
+
+        genre_csv = tmp_path / 'genre.csv'
+        genre_csv.write_text(
+            'id,name,slug\n1,Драма,drama\n2,Рок,rock\n3,Джаз,jazz\n',
+            encoding='utf-8'
+        )
+        settings.DIR_FOR_CSV = str(tmp_path)
+        settings.CSV2DB_MANIFEST_DIR = str(tmp_path / 'manifest')
+        call_command('csv2db', incremental=True)
+        assert Genre.objects.count() == 3
+        assert (tmp_path / 'manifest' / 'genre.json').exists(), (
+            'Проверьте, что csv2db сохраняет манифест загрузки'
+        )
+
+        genre_csv.write_text(
+            'id,name,slug\n1,Драма,drama\n2,Рок-н-ролл,rock\n4,Поп,pop\n',
+            encoding='utf-8'
+        )
+        caplog.set_level('INFO')
+        call_command('csv2db', incremental=True)
+        assert 'Genre: новых строк 1, изменённых 1, удалённых 0.' in (
+            caplog.messages
+        ), 'Проверьте, что csv2db записывает только изменения'
+        assert Genre.objects.get(pk=2).name == 'Рок-н-ролл'
+        assert Genre.objects.filter(pk=3).exists()
+
+        call_command('csv2db', incremental=True, delete=True)
+        assert 'Genre: новых строк 0, изменённых 0, удалённых 1.' in (
+            caplog.messages
+        )
+        assert sorted(Genre.objects.values_list('pk', flat=True)) == [1, 2, 4]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_fast_mode(self, tmp_path, settings, caplog):
+        from django.db import connection
+
+        from reviews.models import Categories, Genre, Title
+
+        def indexes():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' "
+                    "AND sql IS NOT NULL AND tbl_name LIKE 'reviews_%'"
+                )
+                return sorted(row[0] for row in cursor.fetchall())
+
+        before = indexes()
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n', encoding='utf-8'
+        )
+        (tmp_path / 'genre.csv').write_text(
+            'id,name,slug\n1,Драма,drama\n2,Ещё драма,drama\n3,Рок,rock\n',
+            encoding='utf-8'
+        )
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category_id\n1,Один,1990,1\n', encoding='utf-8'
+        )
+        settings.DIR_FOR_CSV = str(tmp_path)
+        caplog.set_level('INFO')
+        call_command('csv2db', fast=True)
+        assert Categories.objects.count() == 1
+        assert Title.objects.count() == 1
+        assert sorted(Genre.objects.values_list('pk', flat=True)) == [1, 3]
+        assert (
+            'Genre: не загружено строк 1, нарушена уникальность (slug). id: 2'
+            in caplog.messages
+        ), 'Проверьте, что csv2db --fast сообщает о нарушениях уникальности'
+        assert indexes() == before, (
+            'Проверьте, что csv2db --fast создаёт индексы заново'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_08_fast_mode_id_conflicts(self, tmp_path, settings, caplog):
+        from reviews.models import Genre
+
+        Genre.objects.create(pk=5, name='Джаз', slug='jazz')
+        (tmp_path / 'genre.csv').write_text(
+            'id,name,slug\n1,Драма,drama\n1,Рок,rock\n5,Блюз,blues\n'
+            '6,Поп,pop\n',
+            encoding='utf-8'
+        )
+        settings.DIR_FOR_CSV = str(tmp_path)
+        caplog.set_level('INFO')
+        call_command('csv2db', fast=True, batch_size=2)
+        assert dict(Genre.objects.values_list('pk', 'slug')) == {
+            1: 'drama', 5: 'jazz', 6: 'pop'
+        }
+        assert (
+            'Genre: не загружено строк 2, нарушена уникальность (id). id: 1, 5'
+            in caplog.messages
+        ), 'Проверьте, что csv2db --fast сообщает о повторяющихся id'
+        assert any(
+            message.startswith('Таблица Genre загружена. Строк: 2,')
+            for message in caplog.messages
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_09_fast_mode_other_constraints(self, tmp_path, settings,
+                                            caplog):
+        from reviews.models import Title
+
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n', encoding='utf-8'
+        )
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category_id\n1,Один,1990,1\n2,Два,-5,1\n'
+            '3,Три,1992,1\n',
+            encoding='utf-8'
+        )
+        settings.DIR_FOR_CSV = str(tmp_path)
+        caplog.set_level('INFO')
+        call_command('csv2db', fast=True, batch_size=2)
+        assert sorted(Title.objects.values_list('pk', flat=True)) == [1, 3]
+        assert (
+            'Title: не загружено строк 1, нарушены другие ограничения. id: 2'
+            in caplog.messages
+        ), (
+            'Проверьте, что csv2db --fast отличает нарушения CHECK и '
+            'NOT NULL от нарушений уникальности'
+        )
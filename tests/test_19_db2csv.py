@@ -0,0 +1,89 @@
+import csv
+import gzip
+import os
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+
+class Test19Db2csv:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export_static_data(self, tmp_path):
+        from reviews.management.commands.csv2db import FILES_CLASSES
+
+        call_command('csv2db')
+        call_command('db2csv', str(tmp_path), chunk_size=7)
+        for name in FILES_CLASSES:
+            with open(os.path.join(settings.DIR_FOR_CSV, f'{name}.csv'),
+                      encoding='utf-8') as file:
+                source = list(csv.DictReader(file))
+            with open(tmp_path / f'{name}.csv', encoding='utf-8') as file:
+                exported = {row['id']: row for row in csv.DictReader(file)}
+            assert len(exported) == len(source), (
+                f'Проверьте, что db2csv выгружает все строки `{name}.csv`'
+            )
+            for expected in source:
+                row = exported[expected['id']]
+                for key, value in expected.items():
+                    if key == 'pub_date':
+                        assert row[key][:19] == value[:19]
+                    else:
+                        assert row[key] == value, (
+                            f'Проверьте, что db2csv выгружает `{key}` '
+                            f'в формате csv2db'
+                        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_gzip_round_trip(self, tmp_path, settings):
+        from reviews.management.commands.csv2db import FILES_CLASSES
+        from reviews.models import Review, Title
+
+        call_command('csv2db')
+        title = Title.objects.get(pk=1)
+        call_command('db2csv', str(tmp_path), gzip=True, workers=2)
+        assert not list(tmp_path.glob('*.tmp'))
+        with gzip.open(tmp_path / 'titles.csv.gz', 'rt',
+                       encoding='utf-8') as file:
+            assert next(csv.reader(file)) == [
+                'id', 'name', 'year', 'category_id', 'description'
+            ]
+
+        for model in reversed(list(FILES_CLASSES.values())):
+            model.objects.all().delete()
+        settings.DIR_FOR_CSV = str(tmp_path)
+        call_command('csv2db')
+        assert Title.objects.get(pk=1).name == title.name
+        assert Title.objects.get(pk=1).rating == title.rating
+        assert Review.objects.count() == 72, (
+            'Проверьте, что выгрузка db2csv загружается обратно csv2db'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_null_round_trip(self, tmp_path, settings):
+        from reviews.management.commands.csv2db import FILES_CLASSES
+        from reviews.models import Categories, Review, Title
+
+        call_command('csv2db')
+        category = Title.objects.get(pk=1).category
+        orphans = set(category.titles.values_list('pk', flat=True))
+        category.delete()
+        Title.objects.filter(pk=2).update(description='Описание')
+        titles = Title.objects.count()
+        call_command('db2csv', str(tmp_path))
+
+        for model in reversed(list(FILES_CLASSES.values())):
+            model.objects.all().delete()
+        settings.DIR_FOR_CSV = str(tmp_path)
+        call_command('csv2db')
+        assert Title.objects.count() == titles, (
+            'Проверьте, что произведения без категории загружаются обратно'
+        )
+        assert set(Title.objects.filter(category=None).values_list(
+            'pk', flat=True
+        )) == orphans
+        assert not Categories.objects.filter(pk=category.pk).exists()
+        assert Title.objects.get(pk=1).description is None
+        assert Title.objects.get(pk=2).description == 'Описание'
+        assert Review.objects.count() == 72
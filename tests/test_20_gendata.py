@@ -0,0 +1,66 @@
+import csv
+
+import pytest
+from django.core.management import call_command
+
+
+class Test20Gendata:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_csv_output(self, tmp_path, settings):
+        from reviews.management.commands.db2csv import HEADERS
+        from reviews.models import Review, Title
+
+        call_command('gendata', titles=40, users=30,
+                     output=str(tmp_path / 'first'), seed=7)
+        call_command('gendata', titles=40, users=30,
+                     output=str(tmp_path / 'second'), seed=7)
+        for name, header in HEADERS.items():
+            first = (tmp_path / 'first' / f'{name}.csv').read_text('utf-8')
+            assert first.split('\n', 1)[0] == ','.join(header), (
+                f'Проверьте, что gendata пишет `{name}.csv` в формате csv2db'
+            )
+            assert first == (
+                tmp_path / 'second' / f'{name}.csv'
+            ).read_text('utf-8'), (
+                'Проверьте, что gendata с одним seed даёт одинаковые данные'
+            )
+        with open(tmp_path / 'first' / 'review.csv',
+                  encoding='utf-8') as file:
+            reviews = list(csv.DictReader(file))
+        pairs = {(row['title_id'], row['author']) for row in reviews}
+        assert len(pairs) == len(reviews), (
+            'Проверьте, что пользователь оставляет один отзыв на произведение'
+        )
+
+        settings.DIR_FOR_CSV = str(tmp_path / 'first')
+        call_command('csv2db')
+        assert Title.objects.count() == 40
+        assert Review.objects.count() == len(reviews)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_database_output(self):
+        from django.db.models import Count
+
+        from reviews.models import Comment, Review, Title, User
+
+        call_command('gendata', titles=200, users=50,
+                     reviews_per_title=5, comments_per_review=1)
+        assert Title.objects.count() == 200
+        assert User.objects.count() == 50
+        assert Comment.objects.exists()
+        counts = list(
+            Title.objects.annotate(reviews_count=Count('reviews'))
+            .order_by().values_list('reviews_count', flat=True)
+        )
+        assert max(counts) > 5 * min(counts) + 5, (
+            'Проверьте, что отзывы распределены по произведениям неравномерно'
+        )
+        title = Title.objects.filter(reviews__isnull=False).first()
+        scores = list(title.reviews.values_list('score', flat=True))
+        assert (title.score_sum, title.score_count) == (
+            sum(scores), len(scores)
+        ), 'Проверьте, что gendata пересчитывает рейтинги'
+        assert Review.objects.filter(
+            text__regex=r'^[А-Яа-яЁё ]+$'
+        ).exists(), 'Проверьте, что gendata генерирует текст кириллицей'
@@ -0,0 +1,73 @@
+import pytest
+from django.core import mail
+
+
+def sign_up(client, username='coder', email='coder@yamdb.fake'):
+    response = client.post('/api/v1/auth/signup/',
+                           data={'username': username, 'email': email})
+    assert response.status_code == 200
+    return mail.outbox[-1].body.rsplit('\n', 1)[-1]
+
+
+class Test21Confirmation:
+    url_token = '/api/v1/auth/token/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_code_obtains_token(self, client, django_user_model):
+        code = sign_up(client)
+        stored = django_user_model.objects.get(username='coder')
+        assert stored.confirmation_code != code
+        assert not stored.confirmation_code.startswith('pbkdf2'), (
+            'Проверьте, что код подтверждения хранится как HMAC, а не как '
+            'хеш пароля'
+        )
+        response = client.post(self.url_token, data={
+            'username': 'coder', 'confirmation_code': code
+        })
+        assert response.status_code == 200
+        assert 'Token' in response.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_attempts_are_limited(self, client, settings,
+                                     django_user_model):
+        from django.core.cache import cache
+
+        code = sign_up(client)
+        wrong = str(int(code) + 1)
+        for _ in range(settings.CONFIRMATION_CODE_ATTEMPTS):
+            response = client.post(self.url_token, data={
+                'username': 'coder', 'confirmation_code': wrong
+            })
+            assert response.status_code == 400
+            # Other processes don't share the cache of this one.
+            cache.clear()
+        stored = django_user_model.objects.get(username='coder')
+        assert stored.confirmation_attempts == (
+            settings.CONFIRMATION_CODE_ATTEMPTS
+        ), 'Проверьте, что попытки ввода кода считаются в базе'
+        response = client.post(self.url_token, data={
+            'username': 'coder', 'confirmation_code': code
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что после исчерпания попыток код не принимается'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_code_expires(self, client, settings):
+        settings.CONFIRMATION_CODE_TTL = -1
+        code = sign_up(client)
+        response = client.post(self.url_token, data={
+            'username': 'coder', 'confirmation_code': code
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что просроченный код не принимается'
+        )
+
+        settings.CONFIRMATION_CODE_TTL = 60
+        new_code = sign_up(client)
+        response = client.post(self.url_token, data={
+            'username': 'coder', 'confirmation_code': new_code
+        })
+        assert response.status_code == 200, (
+            'Проверьте, что после истечения кода можно запросить новый'
+        )
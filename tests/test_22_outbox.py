@@ -0,0 +1,182 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+
+
+def sign_up(client, username='reader'):
+    return client.post('/api/v1/auth/signup/', data={
+        'username': username, 'email': f'{username}@yamdb.fake'
+    })
+
+
+class Test22Outbox:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_queues_email(self, client, settings):
+        from users.models import OutboxMessage
+        from users.outbox import deliver_pending
+
+        settings.OUTBOX_DELIVERY = 'command'
+        outbox_before = len(mail.outbox)
+        assert sign_up(client).status_code == 200
+        assert len(mail.outbox) == outbox_before, (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        message = OutboxMessage.objects.get()
+        assert message.to == 'reader@yamdb.fake'
+
+        assert deliver_pending() == 1
+        assert len(mail.outbox) == outbox_before + 1
+        message.refresh_from_db()
+        assert message.sent_at is not None
+        assert message.body == '', (
+            'Проверьте, что текст с кодом подтверждения не хранится '
+            'после отправки'
+        )
+        assert deliver_pending() == 0, (
+            'Проверьте, что отправленное письмо не отправляется повторно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_batch_uses_one_connection(self, settings, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+
+        from users.outbox import deliver_pending, enqueue
+
+        settings.OUTBOX_DELIVERY = 'command'
+        opened = []
+        original = EmailBackend.open
+        monkeypatch.setattr(
+            EmailBackend, 'open',
+            lambda backend: opened.append(backend) or original(backend)
+        )
+        for number in range(5):
+            enqueue('Тема', 'Текст', f'user{number}@yamdb.fake')
+        assert deliver_pending(batch_size=3) == 3
+        assert deliver_pending(batch_size=3) == 2
+        assert len(opened) == 2, (
+            'Проверьте, что пачка писем отправляется через одно соединение'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_retry_with_backoff(self, settings, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+        from django.utils import timezone
+
+        from users.models import OutboxMessage
+        from users.outbox import deliver_pending, enqueue
+
+        settings.OUTBOX_DELIVERY = 'command'
+
+        def refuse(backend, messages):
+            raise ConnectionRefusedError('SMTP недоступен')
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', refuse)
+        enqueue('Тема', 'Текст', 'reader@yamdb.fake')
+        assert deliver_pending() == 1
+        message = OutboxMessage.objects.get()
+        assert message.attempts == 1 and message.sent_at is None
+        assert 'SMTP недоступен' in message.last_error
+        assert message.send_after >= timezone.now() + timedelta(
+            seconds=settings.OUTBOX_RETRY_DELAY - 5
+        ), 'Проверьте, что повторная отправка откладывается'
+        assert deliver_pending() == 0
+
+        monkeypatch.undo()
+        OutboxMessage.objects.update(send_after=timezone.now())
+        outbox_before = len(mail.outbox)
+        assert deliver_pending() == 1
+        assert len(mail.outbox) == outbox_before + 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_background_thread(self, client, settings):
+        settings.OUTBOX_DELIVERY = 'thread'
+        outbox_before = len(mail.outbox)
+        assert sign_up(client).status_code == 200
+        deadline = time.monotonic() + 5
+        while len(mail.outbox) == outbox_before:
+            assert time.monotonic() < deadline, (
+                'Проверьте, что фоновый поток отправляет письма из очереди'
+            )
+            time.sleep(0.05)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_bad_message_does_not_block(self, client, settings,
+                                           monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+
+        from users.models import OutboxMessage
+        from users.outbox import deliver_pending, enqueue
+
+        settings.OUTBOX_DELIVERY = 'command'
+        original = EmailBackend.send_messages
+
+        def reject(backend, messages):
+            if messages[0].to == ['broken@yamdb.fake']:
+                raise ValueError('Неверный адрес')
+            return original(backend, messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', reject)
+        enqueue('Тема', 'Текст', 'broken@yamdb.fake')
+        enqueue('Тема', 'Текст', 'reader@yamdb.fake')
+        assert deliver_pending() == 2
+        broken = OutboxMessage.objects.get(to='broken@yamdb.fake')
+        assert broken.attempts == 1 and 'ValueError' in broken.last_error
+        assert OutboxMessage.objects.get(
+            to='reader@yamdb.fake'
+        ).sent_at is not None, (
+            'Проверьте, что ошибка одного письма не мешает отправке других'
+        )
+
+        settings.OUTBOX_MAX_ATTEMPTS = 1
+        settings.OUTBOX_DELIVERY = 'sync'
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'broken', 'email': 'broken@yamdb.fake'
+        })
+        assert response.status_code == 200
+        signup = OutboxMessage.objects.get(
+            to='broken@yamdb.fake', subject='Activate your account.'
+        )
+        assert signup.attempts == 1 and signup.body == '', (
+            'Проверьте, что текст письма удаляется, когда попытки исчерпаны'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_claimed_batch(self, settings, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+        from django.db import connection
+        from django.utils import timezone
+
+        from users.models import OutboxMessage
+        from users.outbox import claim, deliver_pending, enqueue
+
+        settings.OUTBOX_DELIVERY = 'command'
+        for number in range(3):
+            enqueue('Тема', 'Текст', f'user{number}@yamdb.fake')
+        claimed = claim(2, timezone.now())
+        assert len(claimed) == 2
+        assert len(claim(10, timezone.now())) == 1, (
+            'Проверьте, что письма, занятые одним обработчиком, '
+            'не достаются другому'
+        )
+
+        original = EmailBackend.send_messages
+
+        def send_outside_transaction(backend, messages):
+            assert not connection.in_atomic_block, (
+                'Проверьте, что письма отправляются вне транзакции'
+            )
+            return original(backend, messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages',
+                            send_outside_transaction)
+        assert deliver_pending() == 0
+        OutboxMessage.objects.update(send_after=timezone.now())
+        outbox_before = len(mail.outbox)
+        assert deliver_pending() == 3, (
+            'Проверьте, что письма становятся доступны после OUTBOX_LEASE'
+        )
+        assert len(mail.outbox) == outbox_before + 3
+        assert not OutboxMessage.objects.exclude(claimed_by='').exists()
@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def user_queries(context):
+    return [query['sql'] for query in context.captured_queries
+            if 'users_user' in query['sql']]
+
+
+class Test23AuthCache:
+    url_me = '/api/v1/users/me/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_repeated_request_skips_user_query(self, user_client):
+        assert user_client.get(self.url_me).status_code == 200
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(self.url_me)
+        assert response.status_code == 200
+        assert response.json()['username'] == 'TestUser'
+        assert not user_queries(context), (
+            'Проверьте, что повторный запрос с тем же токеном не загружает '
+            'пользователя из базы'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_save_invalidates(self, user_client, user):
+        assert user_client.get('/api/v1/users/').status_code == 403
+        user.role = 'admin'
+        user.save()
+        assert user_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что изменение пользователя сбрасывает его кеш'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_inactive_and_deleted_rejected(self, user_client, user):
+        assert user_client.get(self.url_me).status_code == 200
+        user.is_active = False
+        user.save()
+        assert user_client.get(self.url_me).status_code == 401
+        user.delete()
+        assert user_client.get(self.url_me).status_code == 401
+
+    def test_04_lru_and_ttl(self, monkeypatch):
+        from users import authentication
+
+        cache = authentication.LRUCache(maxsize=2, ttl=10)
+        now = [100.0]
+        monkeypatch.setattr(authentication.time, 'monotonic',
+                            lambda: now[0])
+        cache.set(1, 'a')
+        cache.set(2, 'b')
+        assert cache.get(1) == 'a'
+        cache.set(3, 'c')
+        assert cache.get(2) is None, 'Вытесняется давно не читавшийся'
+        assert cache.get(1) == 'a'
+        now[0] += 10
+        assert cache.get(1) is None
+        generation = cache.generation
+        cache.delete(3)
+        cache.set(3, 'stale', generation=generation)
+        assert cache.get(3) is None, (
+            'Проверьте, что значение, прочитанное до сброса, не сохраняется'
+        )
@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def claims_client(user):
+    from users.token import get_tokens_for_user
+
+    client = APIClient()
+    token = get_tokens_for_user(user)['Token']
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def user_queries(context):
+    return [query['sql'] for query in context.captured_queries
+            if 'users_user' in query['sql']]
+
+
+class Test24Claims:
+    url_genres = '/api/v1/genres/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_permissions_from_claims(self, admin, user):
+        admin_client, user_client = claims_client(admin), claims_client(user)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(self.url_genres,
+                                        data={'name': 'Рок', 'slug': 'rock'})
+        assert response.status_code == 403
+        assert not context.captured_queries, (
+            'Проверьте, что права проверяются по токену без запросов к базе'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.url_genres,
+                                         data={'name': 'Рок', 'slug': 'rock'})
+        assert response.status_code == 201
+        assert not user_queries(context), (
+            'Проверьте, что запрос администратора не загружает пользователя'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_role_change_drops_claims(self, admin, user):
+        admin_client, user_client = claims_client(admin), claims_client(user)
+        response = admin_client.patch(f'/api/v1/users/{user.username}/',
+                                      data={'role': 'admin'})
+        assert response.status_code == 200
+        response = user_client.post(self.url_genres,
+                                    data={'name': 'Рок', 'slug': 'rock'})
+        assert response.status_code == 201, (
+            'Проверьте, что смена роли через `/api/v1/users/` отменяет '
+            'роль, записанную в выданных токенах'
+        )
+        response = user_client.patch(f'/api/v1/users/{admin.username}/',
+                                     data={'role': 'user'})
+        assert response.status_code == 200
+        response = admin_client.post(self.url_genres,
+                                     data={'name': 'Джаз', 'slug': 'jazz'})
+        assert response.status_code == 403
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_me_and_deleted_user(self, admin, user):
+        user_client = claims_client(user)
+        response = user_client.patch('/api/v1/users/me/',
+                                     data={'bio': 'Новая биография'})
+        assert response.status_code == 200
+        assert response.json()['bio'] == 'Новая биография'
+        assert response.json()['email'] == user.email
+        response = claims_client(admin).delete(
+            f'/api/v1/users/{user.username}/'
+        )
+        assert response.status_code == 204
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_orm_change_drops_claims(self, admin, user):
+        admin_client = claims_client(admin)
+        admin.role = 'user'
+        admin.save()
+        response = admin_client.post(self.url_genres,
+                                     data={'name': 'Рок', 'slug': 'rock'})
+        assert response.status_code == 403, (
+            'Проверьте, что смена роли в обход API (админка, ORM) отменяет '
+            'роль, записанную в выданных токенах'
+        )
+        user_client = claims_client(user)
+        user.is_active = False
+        user.save()
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токены отключенного пользователя не действуют'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_claims_expire(self, admin, settings):
+        admin_client = claims_client(admin)
+        settings.AUTH_CLAIMS_MAX_AGE = -1
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.url_genres,
+                                         data={'name': 'Рок', 'slug': 'rock'})
+        assert response.status_code == 201
+        assert user_queries(context), (
+            'Проверьте, что по истечении AUTH_CLAIMS_MAX_AGE после выдачи '
+            'токена пользователь загружается из базы'
+        )
@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    from rest_framework_simplejwt.backends import TokenBackend
+
+    calls = []
+    decode = TokenBackend.decode
+
+    def counting(self, token, verify=True):
+        calls.append(token)
+        return decode(self, token, verify)
+
+    monkeypatch.setattr(TokenBackend, 'decode', counting)
+    return calls
+
+
+class Test25TokenCache:
+    url_me = '/api/v1/users/me/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_token_verified_once(self, user_client, decodes):
+        assert user_client.get(self.url_me).status_code == 200
+        assert user_client.get(self.url_me).status_code == 200
+        assert len(decodes) == 1, (
+            'Проверьте, что повторно присланный токен не проверяется заново'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_entry_expires_with_token(self, user, decodes, monkeypatch):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from users import authentication
+
+        token = AccessToken.for_user(user)
+        token.set_exp(lifetime=token.lifetime / 1000)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert client.get(self.url_me).status_code == 200
+        now = authentication.time.monotonic() + token.lifetime.total_seconds()
+        monkeypatch.setattr(authentication.time, 'monotonic', lambda: now)
+        assert client.get(self.url_me).status_code == 200
+        assert len(decodes) == 2, (
+            'Проверьте, что токен хранится в кеше не дольше своего `exp`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_tampered_token_rejected(self, user_client, token_user):
+        assert user_client.get(self.url_me).status_code == 200
+        header, payload, signature = token_user['access'].split('.')
+        tampered = '.'.join((header, payload, signature[::-1]))
+        user_client.credentials(HTTP_AUTHORIZATION=f'Bearer {tampered}')
+        assert user_client.get(self.url_me).status_code == 401
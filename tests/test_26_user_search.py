@@ -0,0 +1,78 @@
+import pytest
+from django.db import connection
+
+USERS = (
+    ('Alice', 'alice@yamdb.fake', 'user'),
+    ('alina', 'a.l@yamdb.fake', 'moderator'),
+    ('Bob', 'bob@yamdb.fake', 'user'),
+    ('boris', 'alboris@yamdb.fake', 'moderator'),
+    ('Carl', 'carl@yamdb.fake', 'user'),
+    ('dima', 'dima@yamdb.fake', 'user'),
+    ('egor', 'egor@yamdb.fake', 'admin'),
+)
+
+
+@pytest.fixture
+def users(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=username, email=email, role=role
+        )
+        for username, email, role in USERS
+    ]
+
+
+def usernames(response):
+    assert response.status_code == 200
+    return [user['username'] for user in response.json()['results']]
+
+
+class Test26UserSearch:
+    url = '/api/v1/users/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_prefix_search(self, admin_client, users):
+        response = admin_client.get(f'{self.url}?search=AL')
+        assert usernames(response) == ['Alice', 'alina', 'boris'], (
+            'Проверьте, что `?search=` ищет по началу username и email '
+            'без учёта регистра'
+        )
+        assert usernames(admin_client.get(f'{self.url}?search=lice')) == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_role_filter(self, admin_client, users):
+        response = admin_client.get(f'{self.url}?role=moderator')
+        assert usernames(response) == ['alina', 'boris']
+        response = admin_client.get(f'{self.url}?role=moderator&search=b')
+        assert usernames(response) == ['boris']
+        assert admin_client.get(f'{self.url}?role=owner').status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_cursor_pagination(self, admin_client, users):
+        url = f'{self.url}?pagination=cursor&role=user'
+        received = []
+        while url:
+            response = admin_client.get(url)
+            received += usernames(response)
+            url = response.json()['next']
+        assert received == ['Alice', 'Bob', 'Carl', 'dima'], (
+            'Проверьте, что курсорная пагинация `/api/v1/users/` обходит '
+            'пользователей в порядке username'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_search_uses_indexes(self, django_user_model):
+        from users.filters import UsersFilter
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('План запроса проверяется для SQLite')
+        queryset = UsersFilter(
+            {'search': 'al'}, django_user_model.objects.all()
+        ).qs
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        assert 'users_user_username_nocase' in plan, plan
+        assert 'users_user_email_nocase' in plan, plan
+        assert 'SCAN' not in plan.replace('SCAN TABLE', 'SCAN'), plan